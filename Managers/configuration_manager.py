@@ -17,7 +17,30 @@ class ConfigurationManager:
     is_ssl: Optional[bool]
     is_debug: Optional[bool]
     is_local: Optional[bool]
+    is_event_driven: Optional[bool]
+    fetch_strategy: Optional[str]
+    is_shared_snapshot: Optional[bool]
+    shared_snapshot_path: Optional[str]
+    is_snapshot_cache: Optional[bool]
+    snapshot_cache_path: Optional[str]
+    is_topology_history: Optional[bool]
+    topology_history_path: Optional[str]
+    topology_history_retention: Optional[int]
+    graph_workers: Optional[int]
+    ozw_max_requests: Optional[int]
+    ozw_request_timeout: Optional[float]
+    ozw_status_ttl: Optional[float]
+    debug_dump: Optional[str]
+    debug_dump_interval: Optional[int]
+    debug_dump_format: Optional[str]
+    is_profiling: Optional[bool]
+    profiling_count: Optional[int]
+    profiling_top: Optional[int]
     server_port: Optional[int]
+    server_mode: Optional[str]
+    server_workers: Optional[int]
+    server_threads: Optional[int]
+    stream_max_clients: Optional[int]
     ssl_context: Optional
 
     def __init__(self):
@@ -27,7 +50,34 @@ class ConfigurationManager:
         self.ssl_certificate = os.environ.get('SSL_CERTIFICATE')
         self.is_debug = bool(os.environ.get('DEBUG', "false").lower() == "true")
         self.is_local = bool(os.environ.get('LOCAL', "false").lower() == "true")
+        self.is_event_driven = bool(os.environ.get('EVENT_DRIVEN', "false").lower() == "true")
+        self.fetch_strategy = os.environ.get('FETCH_STRATEGY', FETCH_STRATEGY_ZWAVE).lower()
+        self.is_shared_snapshot = bool(os.environ.get('SHARED_SNAPSHOT', "false").lower() == "true")
+        self.shared_snapshot_path = os.environ.get('SHARED_SNAPSHOT_PATH', SHARED_SNAPSHOT_PATH)
+        self.is_snapshot_cache = bool(os.environ.get('SNAPSHOT_CACHE', "false").lower() == "true")
+        self.snapshot_cache_path = os.environ.get('SNAPSHOT_CACHE_PATH', SNAPSHOT_CACHE_PATH)
+        self.is_topology_history = bool(os.environ.get('TOPOLOGY_HISTORY', "false").lower() == "true")
+        self.topology_history_path = os.environ.get('TOPOLOGY_HISTORY_PATH', TOPOLOGY_HISTORY_PATH)
+        self.topology_history_retention = max(int(os.environ.get('TOPOLOGY_HISTORY_RETENTION',
+                                                                 TOPOLOGY_HISTORY_RETENTION)), 1)
         self.server_port = int(os.environ.get('SERVER_PORT', SERVER_PORT))
+        self.server_mode = os.environ.get('SERVER_MODE', SERVER_MODE_DEVELOPMENT).lower()
+        self.server_workers = int(os.environ.get('SERVER_WORKERS', SERVER_WORKERS))
+        self.server_threads = int(os.environ.get('SERVER_THREADS', SERVER_THREADS))
+        self.stream_max_clients = max(int(os.environ.get('STREAM_MAX_CLIENTS', self.server_threads // 2)), 1)
+        self.graph_workers = max(int(os.environ.get('GRAPH_WORKERS', GRAPH_WORKERS)), 0)
+        self.ozw_max_requests = int(os.environ.get('OZW_MAX_REQUESTS', OZW_MAX_REQUESTS))
+        self.ozw_request_timeout = float(os.environ.get('OZW_REQUEST_TIMEOUT', OZW_REQUEST_TIMEOUT))
+        self.ozw_status_ttl = float(os.environ.get('OZW_STATUS_TTL', OZW_STATUS_TTL))
+        self.debug_dump = os.environ.get('DEBUG_DUMP', DEBUG_DUMP_MODE_INTERVAL).lower()
+        self.debug_dump_interval = max(int(os.environ.get('DEBUG_DUMP_INTERVAL', DEBUG_DUMP_INTERVAL)), 1)
+        self.debug_dump_format = os.environ.get('DEBUG_DUMP_FORMAT', DEBUG_DUMP_FORMAT_PRETTY).lower()
+        self.is_profiling = bool(os.environ.get('PROFILING', "false").lower() == "true")
+        self.profiling_count = max(int(os.environ.get('PROFILING_COUNT', PROFILING_COUNT)), 1)
+        self.profiling_top = max(int(os.environ.get('PROFILING_TOP', PROFILING_TOP)), 1)
+
+        if self.server_mode == SERVER_MODE_PRODUCTION and self.server_workers > 1:
+            self.is_shared_snapshot = True
 
         self.home_assistant_web_socket_url = self.home_assistant_url.replace("http", "ws")
 
@@ -38,10 +88,10 @@ class ConfigurationManager:
     def _has_valid_content(data):
         return data is not None and data != ""
 
-    def initialize(self):
-        if os.path.exists(DEBUG_DIR):
+    def initialize(self, clear_debug_dir: bool = True):
+        if clear_debug_dir and os.path.exists(DEBUG_DIR):
             for f in os.listdir(DEBUG_DIR):
-                if self.is_local and f.endswith(".json"):
+                if self.is_local and (f.endswith(".json") or f.endswith(".json.gz")):
                     continue
 
                 os.remove(f"{DEBUG_DIR}/{f}")
@@ -59,9 +109,24 @@ class ConfigurationManager:
         if self.home_assistant_token is None:
             raise Exception("Environment variable HA_URL is empty, cannot initialize server")
 
+        if self.server_mode not in SERVER_MODES:
+            raise Exception(f"Environment variable SERVER_MODE is invalid, supported values: {SERVER_MODES}")
+
+        if self.fetch_strategy not in FETCH_STRATEGIES:
+            raise Exception(f"Environment variable FETCH_STRATEGY is invalid, supported values: {FETCH_STRATEGIES}")
+
+        if self.debug_dump not in DEBUG_DUMP_MODES:
+            raise Exception(f"Environment variable DEBUG_DUMP is invalid, supported values: {DEBUG_DUMP_MODES}")
+
+        if self.debug_dump_format not in DEBUG_DUMP_FORMATS:
+            raise Exception(f"Environment variable DEBUG_DUMP_FORMAT is invalid, supported values: {DEBUG_DUMP_FORMATS}")
+
         if self.is_ssl:
             self.ssl_context = (self.ssl_certificate, self.ssl_key)
 
+        if self.server_mode == SERVER_MODE_PRODUCTION and self.server_workers > 1:
+            _LOGGER.info(f"{self.server_workers} server workers, graph is shared by a single sync process")
+
         _LOGGER.info(f"Configuration is valid, data: {self}")
 
     def __repr__(self):
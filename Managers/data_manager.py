@@ -1,22 +1,39 @@
 import aiofiles as aiofiles
 import asyncio
 import asyncws
+import gzip
+import hashlib
 import json
 import logging
+import os
+import random
 import ssl
 import sys
+import threading
+import time
 
 from asyncio import sleep
+from datetime import datetime, timezone
 from models.consts import *
 
+from models.connection_health import ConnectionHealth
 from models.device_identifier import DeviceIdentifier
 
 from models.node import Node
-from models.node_relation import NodeRelation
+from models.node_graph import NodeGraph
+from models.nodes_snapshot import NodesSnapshot
 
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from Managers.configuration_manager import ConfigurationManager
+from Managers.graph_builder import GraphBuilder
+from Managers.graph_history import GraphHistory
+from Managers.json_parser import JsonParser
+from Managers.metrics_manager import MetricsManager
+from Managers.profiling_manager import ProfilingManager
+from Managers.shared_snapshot_manager import SharedSnapshotWriter
+from Managers.snapshot_cache_manager import SnapshotCacheManager
+from Managers.topology_history import TopologyHistory
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,16 +45,72 @@ class HAZWaveManager:
         self._token = configuration.home_assistant_token
         self._ws_url = configuration.home_assistant_web_socket_url
         self._devices = []
-        self._nodes: List[Node] = []
+        self._graph: NodeGraph = NodeGraph()
+        self._pending_graph: Optional[NodeGraph] = None
+        self._nodes_update: Optional[asyncio.TimerHandle] = None
+        self._graph_builder = GraphBuilder(configuration.graph_workers)
+        self._nodes_snapshot: Optional[NodesSnapshot] = None
+        self._nodes_snapshot_condition = threading.Condition()
+        self._graph_history = GraphHistory()
+        self._snapshot_writer: Optional[SharedSnapshotWriter] = None
+
+        if configuration.is_shared_snapshot:
+            self._snapshot_writer = SharedSnapshotWriter(configuration.shared_snapshot_path)
+        self._generation = 0
+
+        self._snapshot_cache: Optional[SnapshotCacheManager] = None
+        self._snapshot_cache_etag: Optional[str] = None
+        self._is_stale = False
+
+        if configuration.is_snapshot_cache and not configuration.is_local:
+            self._snapshot_cache = SnapshotCacheManager(configuration.snapshot_cache_path)
+
+        self._topology_history: Optional[TopologyHistory] = None
+
+        if configuration.is_topology_history:
+            self._topology_history = TopologyHistory(configuration.topology_history_path,
+                                                     configuration.topology_history_retention)
+
+        self._entities: Dict[str, dict] = {}
+        self._entity_devices: Dict[str, dict] = {}
 
         self._states = None
-        self._domain = DOMAIN_ZWAVE
+        self._domains: Set[str] = set()
+
+        self._is_subscribed = False
+        self._subscribed_events: Set[str] = set()
+        self._is_reloading = False
+        self._reload_required: Optional[asyncio.Event] = None
+        self._pending_events: List[dict] = []
 
         self._ws_status = WEB_SOCKET_STATUS_DISCONNECTED
+        self._health = ConnectionHealth()
 
         self._ws: Optional[asyncws.Websocket] = None
 
         self._ws_counter = 1
+        self._reader_task: Optional[asyncio.Future] = None
+        self._heartbeat_task: Optional[asyncio.Future] = None
+        self._requests: Dict[int, asyncio.Future] = {}
+        self._parsers: Dict[int, Callable[[str], dict]] = {}
+        self._request_types: Dict[int, str] = {}
+        self._json_parser = JsonParser()
+        self._login_request: Optional[asyncio.Future] = None
+
+        self._debug_dumps = 0
+        self._debug_files: Dict[str, str] = {}
+
+        self._metrics = MetricsManager()
+        self._profiler = ProfilingManager(configuration.profiling_top)
+
+        self._ozw_statuses: Dict[Tuple[int, int, int], Tuple[float, dict]] = {}
+
+        self._registries: Optional[Dict[str, list]] = None
+        self._is_tracking = False
+        self._is_tracking_supported = True
+        self._tracking_subscription: Optional[int] = None
+        self._tracked_entity_ids: Set[str] = set()
+        self._tracked_states: Optional[Dict[str, dict]] = None
 
         self._ssl_context = None
 
@@ -47,14 +120,25 @@ class HAZWaveManager:
             self._ssl_context.verify_mode = ssl.CERT_NONE
             self._ssl_context.verify_flags = False
 
+        self._set_nodes(NodeGraph())
+
     def initialize(self):
+        if self._topology_history is not None:
+            self._topology_history.start()
+
         asyncio.run(self._initialize())
 
     async def _initialize(self):
         is_local = self._configuration.is_local
 
+        self._reload_required = asyncio.Event()
+
+        reconnect_attempt = 0
+
+        await self._restore_snapshot_cache()
+
         while True:
-            delay_between_iteration = 30
+            delay_between_iteration = RELOAD_INTERVAL
 
             try:
                 if is_local:
@@ -70,13 +154,20 @@ class HAZWaveManager:
                     is_authorized = self._ws_status == WEB_SOCKET_STATUS_AUTHORIZED
 
                     if is_authorized:
+                        reconnect_attempt = 0
+
+                    if is_authorized and not self._is_subscribed:
                         await self._reload_data()
 
+                        if self._configuration.is_event_driven:
+                            await self._subscribe_events()
+
+                    if is_authorized and self._is_subscribed:
+                        await self._listen_events()
+
                     if is_authorized and self._ws.status != 1000:
                         _LOGGER.warning(f"Connection to server failed [Status {self._ws.status}]")
 
-                        delay_between_iteration = 1
-
                         self._ws_status = WEB_SOCKET_STATUS_DISCONNECTED
 
             except Exception as ex:
@@ -87,60 +178,235 @@ class HAZWaveManager:
 
                 self._ws_status = WEB_SOCKET_STATUS_DISCONNECTED
 
-            await sleep(delay_between_iteration)
+            self._publish_shared_health()
+
+            if is_local:
+                await sleep(delay_between_iteration)
+
+            elif self._ws_status == WEB_SOCKET_STATUS_AUTHORIZED:
+                await asyncio.wait([self._reader_task], timeout=delay_between_iteration)
+
+            else:
+                delay_between_iteration = self._get_reconnect_delay(reconnect_attempt)
+                reconnect_attempt += 1
+
+                _LOGGER.info(f"Reconnecting in {delay_between_iteration:.1f} seconds (attempt #{reconnect_attempt})")
+
+                await sleep(delay_between_iteration)
+
+    @staticmethod
+    def _get_reconnect_delay(attempt: int) -> float:
+        max_delay = min(RECONNECT_MAX_DELAY, RECONNECT_MIN_DELAY * (2 ** min(attempt, 16)))
+
+        return (max_delay / 2) + random.uniform(0, max_delay / 2)
+
+    async def _heartbeat(self):
+        while self._ws_status == WEB_SOCKET_STATUS_AUTHORIZED:
+            await sleep(HEARTBEAT_INTERVAL)
+
+            started = time.monotonic()
+
+            response = await self._send_request({"type": "ping"}, HEARTBEAT_TIMEOUT)
+
+            if response is None:
+                if self._ws_status != WEB_SOCKET_STATUS_AUTHORIZED:
+                    break
+
+                _LOGGER.warning(f"No response to heartbeat within {HEARTBEAT_TIMEOUT} seconds, closing connection")
+
+                self._health.heartbeat_failures += 1
+
+                self._ws.writer.close()
+
+                break
+
+            self._health.last_heartbeat_duration = time.monotonic() - started
 
     async def _connect(self):
         try:
             _LOGGER.info(f"Connecting to {self._ws_url}")
 
+            for task in [self._reader_task, self._heartbeat_task]:
+                if task is not None:
+                    task.cancel()
+
+            self._reader_task = None
+            self._heartbeat_task = None
+
             self._ws = await asyncws.connect(f'{self._ws_url}/api/websocket', ssl=self._ssl_context)
 
             self._ws_status = WEB_SOCKET_STATUS_CONNECTED
+            self._is_subscribed = False
+            self._subscribed_events = set()
+
+            self._registries = None
+            self._is_tracking = False
+            self._is_tracking_supported = True
+            self._tracking_subscription = None
+            self._tracked_entity_ids = set()
+            self._tracked_states = None
+
+            self._reader_task = asyncio.ensure_future(self._read_messages())
+
+            if self._health.connections > 0:
+                self._health.reconnects += 1
+
+            self._health.connections += 1
+            self._health.last_connected = datetime.now(timezone.utc)
 
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
             self._ws_status = WEB_SOCKET_STATUS_DISCONNECTED
+            self._health.connection_failures += 1
 
             _LOGGER.error(f"Failed to connect due to error: {ex} [LN: {line}]")
 
+    async def _read_messages(self):
+        while True:
+            try:
+                message = await self._ws.recv()
+
+            except Exception as ex:
+                _LOGGER.error(f"Failed to receive message due to error: {ex}")
+
+                message = None
+
+            if message is None:
+                break
+
+            try:
+                message_json = await self._parse_message(message)
+                message_type = message_json.get("type")
+                message_id = message_json.get("id")
+
+                self._record_message(message, self._request_types.get(message_id, message_type))
+
+                if message_type in WS_AUTH_RESULTS:
+                    if self._login_request is not None and not self._login_request.done():
+                        self._login_request.set_result(message_json)
+
+                elif message_type == WS_AUTH_REQUIRED:
+                    _LOGGER.debug(f"Login message received: {message}")
+
+                elif self._is_event(message_json):
+                    await self._handle_event(message_json)
+
+                elif message_id in self._requests:
+                    request = self._requests.pop(message_id)
+
+                    if not request.done():
+                        request.set_result(message_json)
+
+                else:
+                    _LOGGER.warning(f"Unexpected message received: {message_json}")
+
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                _LOGGER.error(f"Failed to process message {message} due to error: {ex} [LN: {line}]")
+
+        _LOGGER.warning("Connection closed")
+
+        self._ws_status = WEB_SOCKET_STATUS_DISCONNECTED
+        self._is_subscribed = False
+
+        requests = list(self._requests.values())
+        self._requests = {}
+
+        if self._login_request is not None:
+            requests.append(self._login_request)
+
+        for request in requests:
+            if not request.done():
+                request.set_result(None)
+
+    def _record_message(self, message: str, message_type: Optional[str]):
+        message_size = self._get_message_size(message)
+
+        self._metrics.increment(METRIC_WS_RECEIVED_BYTES, message_size, type=message_type)
+        self._metrics.increment(METRIC_WS_RECEIVED_MESSAGES, type=message_type)
+        self._metrics.set(METRIC_WS_PAYLOAD_BYTES, message_size, type=message_type)
+
+    @staticmethod
+    def _get_message_size(message) -> int:
+        if isinstance(message, str) and not message.isascii():
+            return len(message.encode("utf-8"))
+
+        return len(message)
+
+    async def _parse_message(self, message: str) -> dict:
+        parser = None
+
+        if len(self._parsers) > 0:
+            parser = self._parsers.get(self._json_parser.get_message_id(message))
+
+        if parser is None:
+            return self._json_parser.loads(message)
+
+        return await asyncio.get_running_loop().run_in_executor(None, parser, message)
+
+    async def _send_request(self,
+                            data: dict,
+                            timeout: Optional[float] = WS_REQUEST_TIMEOUT,
+                            parser: Optional[Callable[[str], dict]] = None) -> Optional[dict]:
+        self._ws_counter += 1
+
+        message_id = self._ws_counter
+        request = asyncio.get_running_loop().create_future()
+
+        self._requests[message_id] = request
+        self._request_types[message_id] = data.get("type")
+
+        if parser is not None:
+            self._parsers[message_id] = parser
+
+        message = dict(data)
+        message["id"] = message_id
+
+        try:
+            await self._ws.send(json.dumps(message))
+
+            return await asyncio.wait_for(request, timeout)
+
+        except asyncio.TimeoutError:
+            _LOGGER.warning(f"Message #{message_id} ({message.get('type')}) timed out after {timeout} seconds")
+
+        finally:
+            self._requests.pop(message_id, None)
+            self._parsers.pop(message_id, None)
+            self._request_types.pop(message_id, None)
+
+        return None
+
     async def _login(self):
         try:
             _LOGGER.info(f"Logging into {self._ws_url}")
 
-            is_logged_in = False
-            response_message = None
-            ha_version = None
-
             login_data = {
                 'type': 'auth',
                 'access_token': self._token
             }
 
-            await self._ws.send(json.dumps(login_data))
-
-            while True:
-                message = await self._ws.recv()
-                if message is None:
-                    break
+            self._login_request = asyncio.get_running_loop().create_future()
 
-                _LOGGER.debug(f"Login message received: {message}")
+            await self._ws.send(json.dumps(login_data))
 
-                message_json = json.loads(message)
+            response_message = await asyncio.wait_for(self._login_request, WS_REQUEST_TIMEOUT)
 
-                response_type = message_json.get("type")
-                ha_version = message_json.get("ha_version", ha_version)
+            response_type = None if response_message is None else response_message.get("type")
 
-                if response_type == "auth_ok":
-                    is_logged_in = True
-                    break
+            if response_type == WS_AUTH_OK:
+                ha_version = response_message.get("ha_version")
 
-            if is_logged_in:
                 _LOGGER.info(f"Login completed, Home Assistant version: {ha_version}")
 
                 self._ws_status = WEB_SOCKET_STATUS_AUTHORIZED
 
+                self._heartbeat_task = asyncio.ensure_future(self._heartbeat())
+
             else:
                 _LOGGER.error(f"Failed to login due to error: {response_message}")
 
@@ -154,170 +420,575 @@ class HAZWaveManager:
 
             _LOGGER.error(f"Failed to login due to error: {ex} [LN: {line}]")
 
+        self._login_request = None
+
     async def _reload_data(self):
-        _LOGGER.info("Reloading data")
+        with self._profiler.capture(PROFILE_TARGET_RELOAD):
+            _LOGGER.info("Reloading data")
 
-        try:
-            message_mapping = {}
-            data = {}
+            self._is_reloading = True
+            self._debug_dumps += 1
 
-            for request_key in WS_MAIN_DETAILS:
-                self._ws_counter += 1
+            started = time.monotonic()
 
-                request_type = WS_MAIN_DETAILS.get(request_key)
+            try:
+                data = await self._get_main_details()
+                cache_data = None if self._snapshot_cache is None else self._copy_registries(data, data.keys())
 
-                message_mapping[self._ws_counter] = request_key
+                with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_LOAD_DEVICES):
+                    await self.load_devices(data)
 
-                data = {
-                    "id": self._ws_counter,
-                    "type": request_type
-                }
+                if DOMAIN_OZW in self._domains:
+                    with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_OZW):
+                        await self._reload_ozw_data(self._devices)
 
-                await self._ws.send(json.dumps(data))
+                await self._save_debug_file(f"Nodes", self._devices)
 
-            while len(message_mapping.keys()) > 0:
-                message = await self._ws.recv()
-                if message is None:
-                    break
+                self._is_stale = False
 
-                message_json = json.loads(message)
-                if self._is_valid(message_json):
-                    if "id" in message_json:
-                        message_id = message_json.get("id", 0)
-                        result = message_json.get("result")
+                with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_UPDATE_NODES):
+                    self._update_nodes()
 
-                        data_item = message_mapping.get(message_id)
-                        data[data_item] = result
+                self._health.reloads += 1
+                self._health.last_reload = datetime.now(timezone.utc)
+                self._health.last_reload_duration = time.monotonic() - started
 
-                        await self._save_debug_file(data_item, result)
+                await self._save_snapshot_cache(cache_data)
 
-                        del message_mapping[message_id]
+                _LOGGER.info("Data reloaded")
 
-                    else:
-                        _LOGGER.warning(f"Unexpected message received: {message_json}")
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                self._health.reload_failures += 1
+
+                _LOGGER.error(f"Failed to reload data due to error: {ex} [LN: {line}]")
+
+            self._metrics.observe(METRIC_STAGE_DURATION, time.monotonic() - started, stage=STAGE_RELOAD)
+
+            self._is_reloading = False
+
+            await self._process_pending_events()
+
+            self._publish_shared_health()
+
+    async def _get_main_details(self) -> dict:
+        is_zwave_slice = self._configuration.fetch_strategy == FETCH_STRATEGY_ZWAVE
+
+        data = {}
+
+        if self._registries is None:
+            registry_keys = [key for key in WS_MAIN_DETAILS.keys() if key != WS_STATES_DETAILS]
+
+            with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_REGISTRIES):
+                await self._load_details(data, registry_keys)
+
+            if is_zwave_slice:
+                await self._subscribe_events(WS_REGISTRY_EVENTS)
+
+                if all(event_type in self._subscribed_events for event_type in WS_REGISTRY_EVENTS):
+                    self._registries = self._copy_registries(data, registry_keys)
+
+        else:
+            _LOGGER.debug("Using cached registries")
+
+            data.update(self._copy_registries(self._registries, self._registries.keys()))
+
+        entity_ids = self._get_linked_entity_ids(data.get("Devices"), data.get("Entities"))
+
+        if is_zwave_slice:
+            await self._track_states(entity_ids)
+
+        if self._is_tracking and self._tracked_states is not None:
+            data[WS_STATES_DETAILS] = list(self._tracked_states.values())
+
+        else:
+            states_parser = self._json_parser.get_result_filter("entity_id", entity_ids)
+
+            with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_STATES):
+                await self._load_details(data, [WS_STATES_DETAILS], states_parser)
+
+            if self._is_tracking:
+                states = data.get(WS_STATES_DETAILS, [])
+
+                self._tracked_states = {state.get("entity_id"): state for state in states}
+
+        return data
+
+    @staticmethod
+    def _copy_registries(registries: Dict[str, list], keys) -> Dict[str, list]:
+        return {key: [dict(item) for item in registries.get(key) or []] for key in keys}
+
+    async def _track_states(self, entity_ids: Set[str]):
+        if self._is_tracking and entity_ids == self._tracked_entity_ids:
+            return
+
+        if self._tracking_subscription is not None:
+            await self._send_request({"type": "unsubscribe_events", "subscription": self._tracking_subscription})
+
+        self._is_tracking = False
+        self._tracking_subscription = None
+        self._tracked_entity_ids = entity_ids
+        self._tracked_states = None
+
+        if len(entity_ids) == 0 or not self._is_tracking_supported:
+            return
+
+        trigger = {
+            "platform": "state",
+            "entity_id": sorted(entity_ids)
+        }
 
-            await self.load_devices(data)
+        response = await self._send_request({"type": "subscribe_trigger", "trigger": trigger})
 
-            if self._domain == DOMAIN_OZW:
-                await self._reload_ozw_data()
+        if response is None or not self._is_valid(response):
+            _LOGGER.warning("Failed to track Z-Wave states, states will be loaded on every reload")
 
-            await self._save_debug_file(f"Nodes", self._devices)
+            self._is_tracking_supported = False
+
+            return
+
+        _LOGGER.info(f"Tracking states of {len(entity_ids)} entities")
+
+        self._is_tracking = True
+        self._tracking_subscription = response.get("id")
+
+    async def _load_details(self,
+                            data: dict,
+                            data_keys: List[str],
+                            parser: Optional[Callable[[str], dict]] = None):
+        requests = [self._send_request({"type": WS_MAIN_DETAILS.get(key)}, parser=parser) for key in data_keys]
+
+        responses = await asyncio.gather(*requests)
+
+        for data_item, response in zip(data_keys, responses):
+            if response is None or not self._is_valid(response):
+                raise Exception(f"Failed to retrieve {data_item}")
+
+            result = response.get("result")
+
+            data[data_item] = result
+
+            await self._save_debug_file(data_item, result)
+
+    @staticmethod
+    def _get_linked_entity_ids(devices: Optional[List[dict]], entities: Optional[List[dict]]) -> Set[str]:
+        device_ids = set()
+
+        for device in devices or []:
+            identifiers = device.get("identifiers")
+
+            if identifiers is None or len(identifiers) == 0:
+                continue
+
+            identifier_parts = identifiers[0]
+
+            if identifier_parts is not None and len(identifier_parts) > 0 and identifier_parts[0] in SUPPORTED_DOMAINS:
+                device_ids.add(device.get("id"))
+
+        entity_ids = set()
+
+        for entity in entities or []:
+            if entity.get("device_id") in device_ids:
+                entity_ids.add(entity.get("entity_id"))
+
+        return entity_ids
+
+    async def _reload_local_data(self):
+        with self._profiler.capture(PROFILE_TARGET_RELOAD):
+            _LOGGER.info("Loading from local debug files")
+
+            try:
+                data = {}
+
+                for key in WS_MAIN_DETAILS.keys():
+                    data_item = await self._get_debug_file(key)
+                    data[key] = data_item
+
+                await self.load_devices(data)
+
+                if DOMAIN_OZW in self._domains:
+                    for device in self._devices:
+                        if device.get("Domain") == DOMAIN_OZW:
+                            device["OZWStatus"] = await self._get_debug_file(self._get_ozw_status_name(device))
+
+                self._update_nodes()
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                _LOGGER.error(f"Failed to reload data locally due to error: {ex} [LN: {line}]")
+
+    async def _reload_ozw_data(self, devices: List[dict]):
+        _LOGGER.info("Processing OZW data")
+
+        status_ttl = self._configuration.ozw_status_ttl
+        semaphore = asyncio.Semaphore(self._configuration.ozw_max_requests)
+
+        pending_devices = []
+
+        for device in devices:
+            if device.get("Domain") != DOMAIN_OZW or device.get("InstanceID") != 1:
+                continue
+
+            ozw_status = self._ozw_statuses.get(self._get_ozw_key(device))
+
+            if ozw_status is not None:
+                device["OZWStatus"] = ozw_status[1]
+
+                if time.monotonic() - ozw_status[0] < status_ttl:
+                    continue
+
+            pending_devices.append(device)
+
+        _LOGGER.debug(f"Requesting status of {len(pending_devices)} OZW devices")
+
+        async def reload_ozw_device(ozw_device: dict):
+            async with semaphore:
+                await self.load_ozw_device(ozw_device)
+
+        await asyncio.gather(*[reload_ozw_device(device) for device in pending_devices])
+
+        _LOGGER.info("OZW data processed")
+
+    async def _restore_snapshot_cache(self):
+        if self._snapshot_cache is None:
+            return
+
+        try:
+            started = time.monotonic()
+            loop = asyncio.get_running_loop()
 
+            cache = await loop.run_in_executor(None, self._snapshot_cache.load)
+
+            if cache is None:
+                return
+
+            cache_age = time.time() - cache.get("saved", 0)
+
+            for controller_id, node_id, instance_id, status_age, ozw_status in cache.get("ozw_statuses", []):
+                ozw_key = (controller_id, node_id, instance_id)
+
+                self._ozw_statuses[ozw_key] = (started - cache_age - status_age, ozw_status)
+
+            await self.load_devices(cache.get("data", {}))
+
+            if DOMAIN_OZW in self._domains:
+                for device in self._devices:
+                    ozw_status = self._ozw_statuses.get(self._get_ozw_key(device))
+
+                    if device.get("Domain") == DOMAIN_OZW and device.get("InstanceID") == 1 and ozw_status is not None:
+                        device["OZWStatus"] = ozw_status[1]
+
+            self._is_stale = True
             self._update_nodes()
 
-            _LOGGER.info("Data reloaded")
+            self._snapshot_cache_etag = cache.get("etag")
+
+            _LOGGER.info(f"{len(self._nodes_snapshot.nodes)} nodes restored from snapshot cache "
+                         f"(saved {cache_age:.0f} seconds ago) in {time.monotonic() - started:.3f} seconds")
 
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
-            _LOGGER.error(f"Failed to reload data due to error: {ex} [LN: {line}]")
+            _LOGGER.error(f"Failed to restore snapshot cache due to error: {ex} [LN: {line}]")
 
-    async def _reload_local_data(self):
-        _LOGGER.info("Loading from local debug files")
+    async def _save_snapshot_cache(self, data: Optional[Dict[str, list]]):
+        snapshot = self._nodes_snapshot
+
+        if self._snapshot_cache is None or data is None or snapshot.etag == self._snapshot_cache_etag:
+            return
 
         try:
-            data = {}
+            now = time.monotonic()
+            loop = asyncio.get_running_loop()
 
-            for key in WS_MAIN_DETAILS.keys():
-                data_item = await self._get_debug_file(key)
-                data[key] = data_item
+            ozw_statuses = []
 
-            await self.load_devices(data)
+            for ozw_key, ozw_status in self._ozw_statuses.items():
+                controller_id, node_id, instance_id = ozw_key
 
-            if self._domain == DOMAIN_OZW:
-                for device in self._devices:
-                    device_node_id = device.get("NodeID")
+                ozw_statuses.append([controller_id, node_id, instance_id, now - ozw_status[0], ozw_status[1]])
 
-                    device_status = await self._get_debug_file(f"OZWStatus_{device_node_id}")
+            cache = {
+                "etag": snapshot.etag,
+                "domains": sorted(self._domains),
+                "data": data,
+                "ozw_statuses": ozw_statuses
+            }
 
-                    device["OZWStatus"] = device_status
+            size = await loop.run_in_executor(None, self._snapshot_cache.save, cache)
+
+            self._snapshot_cache_etag = snapshot.etag
+
+            _LOGGER.debug(f"Snapshot cache saved, size: {size} bytes, took {time.monotonic() - now:.3f} seconds")
 
-            self._update_nodes()
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
-            _LOGGER.error(f"Failed to reload data locally due to error: {ex} [LN: {line}]")
+            _LOGGER.error(f"Failed to save snapshot cache due to error: {ex} [LN: {line}]")
 
-    async def _reload_ozw_data(self):
-        _LOGGER.info("Processing OZW data")
-        message_mapping = {}
+    def _get_required_events(self) -> List[str]:
+        event_types = []
 
-        for device in self._devices:
-            device_controller_id = device.get("ControllerID")
-            device_node_id = device.get("NodeID")
-            device_instance_id = device.get("InstanceID")
+        for event_type in WS_EVENTS:
+            if event_type == EVENT_STATE_CHANGED and self._is_tracking:
+                continue
 
-            device_key = self.get_message_id(device_controller_id, device_node_id, device_instance_id)
+            event_types.append(event_type)
 
-            new_message_id = await self.load_ozw_device(device)
+        return event_types
 
-            if new_message_id is not None:
-                message_mapping[new_message_id] = device_key
+    async def _subscribe_events(self, event_types: Optional[List[str]] = None):
+        _LOGGER.info("Subscribing to events")
+
+        is_listening = event_types is None
+
+        if is_listening:
+            event_types = self._get_required_events()
+
+        try:
+            event_types = [event_type for event_type in event_types if event_type not in self._subscribed_events]
+
+            requests = [self._send_request({"type": "subscribe_events", "event_type": event_type})
+                        for event_type in event_types]
+
+            responses = await asyncio.gather(*requests)
+
+            is_subscribed = True
+
+            for event_type, response in zip(event_types, responses):
+                if response is None or not self._is_valid(response):
+                    _LOGGER.error(f"Failed to subscribe to {event_type} events")
+
+                    is_subscribed = False
+
+                else:
+                    self._subscribed_events.add(event_type)
+
+            if is_subscribed:
+                _LOGGER.info("Subscribed to events")
+
+            if is_listening:
+                self._is_subscribed = is_subscribed
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            if is_listening:
+                self._is_subscribed = False
+
+            _LOGGER.error(f"Failed to subscribe to events due to error: {ex} [LN: {line}]")
+
+    async def _listen_events(self):
+        _LOGGER.info("Listening to events")
+
+        while self._is_subscribed:
+            reload_required = asyncio.ensure_future(self._reload_required.wait())
+
+            await asyncio.wait([reload_required, self._reader_task],
+                               timeout=self._get_ozw_refresh_interval(),
+                               return_when=asyncio.FIRST_COMPLETED)
+
+            if self._reader_task.done():
+                reload_required.cancel()
+
+                _LOGGER.warning("Events subscription closed")
+
+                self._is_subscribed = False
 
-        while len(message_mapping.keys()) > 0:
-            message = await self._ws.recv()
-            if message is None:
                 break
 
-            message_json = json.loads(message)
+            if not reload_required.done():
+                reload_required.cancel()
 
-            if self._is_valid(message_json):
-                if "id" in message_json:
-                    message_id = message_json.get("id", 0)
-                    result = message_json.get("result")
+                await self._refresh_ozw_data()
 
-                    if message_id > 0:
-                        message_device_key = message_mapping[message_id]
+                continue
 
-                        for device in self._devices:
-                            device_controller_id = device.get("ControllerID")
-                            device_node_id = device.get("NodeID")
-                            device_instance_id = device.get("InstanceID")
+            self._reload_required.clear()
 
-                            device_key = self.get_message_id(device_controller_id, device_node_id, device_instance_id)
+            await self._reload_data()
 
-                            if message_device_key == device_key:
-                                _LOGGER.debug(f"Processing OZW device {device_node_id}")
+    def _get_ozw_refresh_interval(self) -> Optional[float]:
+        if DOMAIN_OZW not in self._domains:
+            return None
 
-                                await self._save_debug_file(f"OZWStatus_{device_node_id}", result)
+        status_ttl = self._configuration.ozw_status_ttl
 
-                                device["OZWStatus"] = result
+        return status_ttl if status_ttl > 0 else RELOAD_INTERVAL
 
-                        del message_mapping[message_id]
+    async def _refresh_ozw_data(self):
+        self._is_reloading = True
 
-                else:
-                    _LOGGER.warning(f"Unexpected message received: {message_json}")
+        try:
+            current_devices = [device for device in self._devices
+                               if device.get("Domain") == DOMAIN_OZW and device.get("InstanceID") == 1]
+            devices = [dict(device) for device in current_devices]
 
-        _LOGGER.info("OZW data processed")
+            with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_OZW):
+                await self._reload_ozw_data(devices)
+
+            changed_devices = {id(current_device): device for current_device, device in zip(current_devices, devices)
+                               if device.get("OZWStatus") != current_device.get("OZWStatus")}
+
+            if len(changed_devices) > 0:
+                _LOGGER.info(f"Status of {len(changed_devices)} OZW devices changed, updating graph")
+
+                self._devices = [changed_devices.get(id(device), device) for device in self._devices]
+
+                for device in changed_devices.values():
+                    for entity in device.get("Entities", []):
+                        self._entity_devices[entity.get("entity_id")] = device
+
+                with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_UPDATE_NODES):
+                    self._update_nodes()
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to refresh OZW data due to error: {ex} [LN: {line}]")
+
+        self._is_reloading = False
+
+        await self._process_pending_events()
+
+    @staticmethod
+    def _is_event(message) -> bool:
+        return message.get("type") == "event"
+
+    async def _handle_event(self, message):
+        if self._is_reloading:
+            self._pending_events.append(message)
+            return
+
+        try:
+            event = message.get("event", {})
+            event_type = event.get("event_type")
+            event_data = event.get("data", {})
+            trigger = event.get("variables", {}).get("trigger")
+
+            if trigger is not None:
+                self._update_state(trigger.get("entity_id"), trigger.get("to_state"))
+
+            elif event_type == EVENT_STATE_CHANGED:
+                self._update_state(event_data.get("entity_id"), event_data.get("new_state"))
+
+            elif event_type in WS_REGISTRY_EVENTS:
+                _LOGGER.info(f"Registry changed ({event_type}), reload required")
+
+                self._registries = None
+
+                self._reload_required.set()
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to handle event {message} due to error: {ex} [LN: {line}]")
+
+    async def _process_pending_events(self):
+        pending_events = self._pending_events
+        self._pending_events = []
+
+        for message in pending_events:
+            await self._handle_event(message)
+
+    def _update_state(self, entity_id: Optional[str], state: Optional[dict]):
+        if self._tracked_states is not None and entity_id in self._tracked_entity_ids:
+            if state is None:
+                self._tracked_states.pop(entity_id, None)
+
+            else:
+                self._tracked_states[entity_id] = state
+
+        current_device = self._entity_devices.get(entity_id)
+
+        if current_device is None:
+            return
+
+        current_entity = self._entities.get(entity_id)
+
+        entity = dict(current_entity)
+        entity.pop("State", None)
+
+        if state is not None:
+            entity["State"] = state
+
+        device = dict(current_device)
+        device["Entities"] = [entity if item is current_entity else item for item in device.get("Entities", [])]
+
+        if f"{DOMAIN_ZWAVE}." in entity_id:
+            device["ZWaveStatus"] = state
+
+        self._entities[entity_id] = entity
+
+        for item in device["Entities"]:
+            self._entity_devices[item.get("entity_id")] = device
+
+        self._devices = [device if item is current_device else item for item in self._devices]
+
+        self._update_node(current_device, device)
+
+    def _update_node(self, current_device: dict, device: dict):
+        graph = self._graph if self._pending_graph is None else self._pending_graph
+        node = Node(device)
+
+        for index in range(len(graph.nodes)):
+            current_node = graph.nodes[index]
+
+            if current_node.device is current_device:
+                if current_node.neighbors != node.neighbors or current_node.isPrimary != node.isPrimary:
+                    _LOGGER.info(f"Neighbors of node {node.id} changed, updating graph")
+
+                    self._update_nodes()
+
+                    break
+
+                node.hop = current_node.hop
+
+                _LOGGER.debug(f"Node {node.id} changed")
+
+                self._pending_graph = graph.replace_node(index, node)
+
+                self._schedule_nodes_update()
+
+                break
+
+    def _schedule_nodes_update(self):
+        if self._nodes_update is None:
+            self._nodes_update = asyncio.get_event_loop().call_later(NODES_UPDATE_DELAY, self._set_pending_nodes)
+
+    def _set_pending_nodes(self):
+        self._nodes_update = None
+
+        if self._pending_graph is not None:
+            self._set_nodes(self._pending_graph)
 
     def _update_nodes(self):
         try:
-            nodes = []
+            controller_nodes: Dict[str, List[Node]] = {}
 
             for device in self._devices:
                 node = Node(device)
 
-                nodes.append(node)
+                if node.controller not in controller_nodes:
+                    controller_nodes[node.controller] = []
 
-            hub = self._get_hub(nodes)
+                controller_nodes[node.controller].append(node)
 
-            if hub is None or hub.neighbors is None:
+            graphs = self._graph_builder.build_all(controller_nodes)
+
+            if len(graphs) == 0:
                 _LOGGER.error("No hub found")
                 return
 
-            for node in nodes:
-                self._update_edges(node, nodes)
-
-            for hop in range(len(nodes)):
-                if not self._update_hop(hop, nodes):
-                    break
-
-            for node in nodes:
-                self._update_relation_type(node, nodes)
-
-            self._nodes = nodes
+            self._set_nodes(NodeGraph.combine(graphs))
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
@@ -363,153 +1034,179 @@ class HAZWaveManager:
 
             return None
 
-    @staticmethod
-    def _get_hub(nodes: List[Node]) -> Optional[Node]:
-        for node in nodes:
-            if node.isPrimary:
-                return node
+    def _set_nodes(self, graph: NodeGraph):
+        self._pending_graph = None
 
-        return None
+        if self._nodes_update is not None:
+            self._nodes_update.cancel()
+            self._nodes_update = None
 
-    @staticmethod
-    def _get_node(nodes: List[Node], node_id: int) -> Optional[Node]:
-        for node in nodes:
-            if node.id == node_id:
-                return node
+        with self._metrics.measure(METRIC_STAGE_DURATION, stage=STAGE_SERIALIZE):
+            items = graph.to_list()
+            controllers_content = {controller: json.dumps(items[node_range[0]:node_range[1]]).encode("utf-8")
+                                   for controller, node_range in graph.controllers.items()}
 
-        return None
+            content = self._join_contents(list(controllers_content.values()))
 
-    def _update_edges(self, node: Node, nodes: List[Node]):
-        try:
-            neighbors = node.neighbors
+        self._generation += 1
 
-            if node.edges is None:
-                node.edges = []
+        snapshot = NodesSnapshot()
+        snapshot.generation = self._generation
+        snapshot.graph = graph
+        snapshot.nodes = graph.nodes
+        snapshot.nodes_map = {}
+        snapshot.controllers = graph.get_controllers()
+        snapshot.controllers_content = controllers_content
+        snapshot.content = content
+        snapshot.etag = hashlib.sha1(content).hexdigest()
+        snapshot.last_modified = datetime.now(timezone.utc)
+        snapshot.is_stale = self._is_stale
 
-            if neighbors is None:
-                hub = self._get_hub(nodes)
+        for index in range(len(graph.nodes)):
+            node = graph.nodes[index]
+            node_key = (node.id, node.instanceId, node.controller)
 
-                if hub is not None:
-                    relation = NodeRelation()
-                    relation.id = node.id
-                    relation.toNodeId = hub.id
+            if node_key not in snapshot.nodes_map:
+                snapshot.nodes_map[node_key] = index
 
-                    _LOGGER.debug(f"Associate nodes W/O neighbors: {relation.id} --> {relation.toNodeId}")
+        current_snapshot = self._nodes_snapshot
 
-                    node.edges.append(relation)
+        if current_snapshot is not None and current_snapshot.etag == snapshot.etag:
+            snapshot.last_modified = current_snapshot.last_modified
 
-                    if hub.edges is None:
-                        hub.edges = []
+        self._graph = graph
 
-                    should_created_op = True
-                    for neighbor_edge in hub.edges:
-                        if neighbor_edge.toNodeId == node.id:
-                            should_created_op = False
+        self._graph_history.add(snapshot.generation, items, len(content))
 
-                    if should_created_op:
-                        op_relation = NodeRelation()
-                        op_relation.id = hub.id
-                        op_relation.toNodeId = node.id
+        if self._topology_history is not None and not self._is_stale:
+            self._topology_history.record(graph)
 
-                        _LOGGER.debug(f"Associate reverse nodes W/O neighbors: {op_relation.id} --> {op_relation.toNodeId}")
+        if self._snapshot_writer is not None:
+            self._publish_shared_snapshot(snapshot)
 
-                        hub.edges.append(op_relation)
-            else:
-                for neighbor_id in neighbors:
-                    neighbor = self._get_node(nodes, neighbor_id)
+        with self._nodes_snapshot_condition:
+            self._nodes_snapshot = snapshot
+
+            self._nodes_snapshot_condition.notify_all()
 
-                    if neighbor is not None:
-                        relation = NodeRelation()
-                        relation.id = node.id
-                        relation.toNodeId = neighbor.id
+    @staticmethod
+    def _join_contents(contents: List[bytes]) -> bytes:
+        if len(contents) == 1:
+            return contents[0]
+
+        return b"[" + b", ".join([content[1:-1] for content in contents if len(content) > 2]) + b"]"
+
+    @staticmethod
+    def _get_node_index(snapshot: NodesSnapshot,
+                        node_id: int,
+                        instance_id: int,
+                        controller: Optional[str]) -> Optional[int]:
+        controllers = snapshot.graph.controllers.keys() if controller is None else [controller]
+
+        for node_controller in controllers:
+            index = snapshot.nodes_map.get((node_id, instance_id, node_controller))
+
+            if index is not None:
+                return index
 
-                        _LOGGER.debug(f"Associate nodes: {relation.id} --> {relation.toNodeId}")
+        return None
 
-                        node.edges.append(relation)
+    def _publish_shared_snapshot(self, snapshot: NodesSnapshot):
+        try:
+            nodes_details = {}
 
-                        if neighbor.edges is None:
-                            neighbor.edges = []
+            for node_key, index in snapshot.nodes_map.items():
+                node_details = json.dumps(snapshot.graph.to_dict(index, include_device=True)).encode("utf-8")
 
-                        should_created_op = True
-                        for neighbor_edge in neighbor.edges:
-                            if neighbor_edge.toNodeId == node.id:
-                                should_created_op = False
+                nodes_details[f"{node_key[0]}.{node_key[1]}.{node_key[2]}"] = node_details
 
-                        if should_created_op:
-                            op_relation = NodeRelation()
-                            op_relation.id = neighbor.id
-                            op_relation.toNodeId = node.id
+            topologies = {controller: json.dumps(snapshot.graph.get_topology(controller)).encode("utf-8")
+                          for controller in snapshot.graph.controllers.keys()}
 
-                            _LOGGER.debug(f"Associate reverse nodes: {op_relation.id} --> {op_relation.toNodeId}")
+            self._snapshot_writer.publish(snapshot, nodes_details, self._graph_history.get_steps(), topologies)
 
-                            neighbor.edges.append(op_relation)
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
-            _LOGGER.error(f"Failed to update edges due to error: {ex} [LN: {line}]")
+            _LOGGER.error(f"Failed to publish shared snapshot due to error: {ex} [LN: {line}]")
 
-    def _update_hop(self, hop: int, nodes: List[Node]) -> bool:
-        result = False
-        hop_nodes = []
+    def _publish_shared_health(self):
+        if self._snapshot_writer is None:
+            return
 
         try:
-            for node in nodes:
-                if node.hop == hop:
-                    hop_nodes.append(node)
+            self._snapshot_writer.publish_health(self.get_health())
+            self._snapshot_writer.publish_metrics(self.get_metrics())
 
-                    result = True
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
 
-            for node in hop_nodes:
-                current_hop = node.hop
-                sub_nodes: List[Node] = []
+            _LOGGER.error(f"Failed to publish shared health due to error: {ex} [LN: {line}]")
 
-                _LOGGER.debug(f"Processing node {node.id}, HOP:{node.hop}")
+    def get_nodes_delta(self, snapshot: NodesSnapshot, since: int, controller: Optional[str] = None) -> bytes:
+        return self._graph_history.get_delta(since, snapshot, controller)
 
-                for edge in node.edges:
-                    to_node = self._get_node(nodes, edge.toNodeId)
+    def get_nodes(self):
+        return self._nodes_snapshot.nodes
 
-                    _LOGGER.debug(f"Processing nested node {to_node.id}, HOP:{to_node.hop}")
+    def get_node(self, node_id: int, instance_id: int = 1, controller: Optional[str] = None) -> Optional[Node]:
+        snapshot = self._nodes_snapshot
+        index = self._get_node_index(snapshot, node_id, instance_id, controller)
 
-                    if to_node is not None and to_node.hop == -1:
-                        to_node.hop = current_hop + 1
+        return None if index is None else snapshot.nodes[index]
 
-                        _LOGGER.debug(f"Changed HOP of nested node {to_node.id} to {to_node.hop}")
+    def get_node_details(self,
+                         node_id: int,
+                         instance_id: int = 1,
+                         controller: Optional[str] = None) -> Optional[dict]:
+        snapshot = self._nodes_snapshot
+        index = self._get_node_index(snapshot, node_id, instance_id, controller)
 
-                        sub_nodes.append(to_node)
-        except Exception as ex:
-            trace_back = sys.exc_info()[2]
-            line = trace_back.tb_lineno
+        return None if index is None else snapshot.graph.to_dict(index, include_device=True)
 
-            _LOGGER.error(f"Failed to update hop due to error: {ex} [LN: {line}]")
+    def get_health(self) -> dict:
+        health = self._health.to_dict()
+        health["status"] = self._ws_status
+        health["generation"] = self._nodes_snapshot.generation
+        health["stale"] = self._nodes_snapshot.is_stale
 
-        return result
+        return health
 
-    def _update_relation_type(self, node: Node, nodes: List[Node]):
-        try:
-            for edge in node.edges:
-                to_node = self._get_node(nodes, edge.toNodeId)
+    def get_metrics(self) -> str:
+        snapshot = self._nodes_snapshot
 
-                edge_type = "child"
+        self._metrics.set(METRIC_NODES, len(snapshot.nodes))
+        self._metrics.set(METRIC_EDGES, len(snapshot.graph.targets))
+        self._metrics.set(METRIC_DEVICES, len(self._devices))
+        self._metrics.set(METRIC_ENTITIES, len(self._entities))
+        self._metrics.set(METRIC_TRACKED_ENTITIES, len(self._tracked_entity_ids) if self._is_tracking else 0)
+        self._metrics.set(METRIC_GENERATION, snapshot.generation)
+        self._metrics.set(METRIC_NODES_JSON_BYTES, len(snapshot.content))
+        self._metrics.set(METRIC_CONNECTED, 1 if self._ws_status == WEB_SOCKET_STATUS_AUTHORIZED else 0)
+        self._metrics.set(METRIC_CONNECTIONS, self._health.connections)
+        self._metrics.set(METRIC_CONNECTION_FAILURES, self._health.connection_failures)
+        self._metrics.set(METRIC_HEARTBEAT_FAILURES, self._health.heartbeat_failures)
+        self._metrics.set(METRIC_RELOADS, self._health.reloads)
+        self._metrics.set(METRIC_RELOAD_FAILURES, self._health.reload_failures)
 
-                if node.hop == to_node.hop:
-                    edge_type = "sibling"
+        return self._metrics.render()
 
-                elif node.hop < to_node.hop and not to_node.isPrimary:
-                    edge_type = "parent"
+    def get_topology_history(self) -> Optional[TopologyHistory]:
+        return self._topology_history
 
-                edge.type = edge_type
+    def get_profiler(self) -> ProfilingManager:
+        return self._profiler
 
-                msg = f"Update relation of node {edge.id} to node {edge.toNodeId}, Type: {edge.type}, HOP: {node.hop}"
-                _LOGGER.debug(msg)
-        except Exception as ex:
-            trace_back = sys.exc_info()[2]
-            line = trace_back.tb_lineno
+    def get_nodes_snapshot(self) -> NodesSnapshot:
+        return self._nodes_snapshot
 
-            _LOGGER.error(f"Failed to update relation type due for {node} to error: {ex} [LN: {line}]")
+    def wait_for_nodes_snapshot(self, generation: int, timeout: float) -> NodesSnapshot:
+        with self._nodes_snapshot_condition:
+            self._nodes_snapshot_condition.wait_for(lambda: self._nodes_snapshot.generation > generation, timeout)
 
-    def get_nodes(self):
-        return self._nodes
+            return self._nodes_snapshot
 
     async def load_devices(self, data):
         _LOGGER.info(f"Loading devices")
@@ -518,9 +1215,12 @@ class HAZWaveManager:
         entities = data.get("Entities", [])
         states = data.get("States", [])
 
-        all_devices = {}
+        controller_devices = {}
 
         try:
+            device_entities = self._group_by(entities, "device_id")
+            entity_states = {state.get("entity_id"): state for state in states}
+
             for device in devices:
                 device_id = device.get("id")
                 device_identifier = self.get_device_identifier(device)
@@ -529,43 +1229,70 @@ class HAZWaveManager:
                 device["ControllerID"] = device_identifier.controller_id
                 device["NodeID"] = device_identifier.node_id
                 device["InstanceID"] = device_identifier.instance_id
+                device["Controller"] = f"{device_identifier.domain}.{device_identifier.controller_id}"
 
-                for entity in entities:
-                    entity_device_id = entity.get("device_id")
-
-                    if device_id == entity_device_id:
-                        entity_id = entity.get("entity_id")
+                for entity in device_entities.get(device_id, []):
+                    entity_id = entity.get("entity_id")
+                    state = entity_states.get(entity_id)
 
-                        for state in states:
-                            state_entity_id = state.get("entity_id")
+                    if state is not None:
+                        entity["State"] = state
 
-                            if state_entity_id == entity_id:
-                                entity["State"] = state
+                        if f"{DOMAIN_ZWAVE}." in entity_id:
+                            device["ZWaveStatus"] = state
 
-                                if f"{DOMAIN_ZWAVE}." in state_entity_id:
-                                    device["ZWaveStatus"] = state
+                    if "Entities" not in device:
+                        device["Entities"] = []
 
-                        if "Entities" not in device:
-                            device["Entities"] = []
+                    device["Entities"].append(entity)
 
-                        device["Entities"].append(entity)
+                if device_identifier.domain not in CONTROLLER_DOMAINS:
+                    continue
 
-                if all_devices.get(device_identifier.domain) is None:
-                    all_devices[device_identifier.domain] = []
+                controller_key = (CONTROLLER_DOMAINS.index(device_identifier.domain), device_identifier.controller_id)
 
-                all_devices[device_identifier.domain].append(device)
+                if controller_devices.get(controller_key) is None:
+                    controller_devices[controller_key] = []
 
-            if len(all_devices.get(DOMAIN_OZW, [])) > 0:
-                self._domain = DOMAIN_OZW
+                controller_devices[controller_key].append(device)
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
             _LOGGER.error(f"Failed to load devices due to error: {ex} [LN: {line}]")
 
-        self._devices = all_devices.get(self._domain, [])
+        self._devices = []
+        self._domains = set()
+
+        for controller_key in sorted(controller_devices.keys()):
+            self._devices.extend(controller_devices[controller_key])
+            self._domains.add(CONTROLLER_DOMAINS[controller_key[0]])
+
+        self._entities = {}
+        self._entity_devices = {}
+
+        for device in self._devices:
+            for entity in device.get("Entities", []):
+                entity_id = entity.get("entity_id")
+
+                self._entities[entity_id] = entity
+                self._entity_devices[entity_id] = device
+
+        _LOGGER.info(f"{len(self._devices)} devices of {len(controller_devices)} controllers loaded")
 
-        _LOGGER.info(f"{len(self._devices)} {self._domain.upper()} devices loaded")
+    @staticmethod
+    def _group_by(items: List[dict], key: str) -> dict:
+        groups = {}
+
+        for item in items:
+            item_key = item.get(key)
+
+            if item_key not in groups:
+                groups[item_key] = []
+
+            groups[item_key].append(item)
+
+        return groups
 
     @staticmethod
     def get_device_identifier(device):
@@ -608,50 +1335,121 @@ class HAZWaveManager:
 
         return device_identifier
 
-    @staticmethod
-    async def _save_debug_file(name, data):
-        content = json.dumps(data, indent=4)
+    def _is_debug_dump_required(self) -> bool:
+        dump_policy = self._configuration.debug_dump
+
+        if dump_policy == DEBUG_DUMP_MODE_OFF:
+            return False
+
+        if dump_policy == DEBUG_DUMP_MODE_INTERVAL:
+            return (self._debug_dumps - 1) % self._configuration.debug_dump_interval == 0
+
+        return True
+
+    def _serialize_debug_content(self, data) -> bytes:
+        dump_format = self._configuration.debug_dump_format
+
+        if dump_format == DEBUG_DUMP_FORMAT_PRETTY:
+            content = json.dumps(data, indent=4)
+        else:
+            content = json.dumps(data, separators=(",", ":"))
+
+        return content.encode("utf-8")
+
+    async def _save_debug_file(self, name, data):
+        try:
+            if not self._is_debug_dump_required():
+                return
+
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            file_name = name.lower()
+
+            content = await loop.run_in_executor(None, self._serialize_debug_content, data)
+
+            if self._configuration.debug_dump == DEBUG_DUMP_MODE_CHANGED:
+                content_hash = hashlib.sha1(content).hexdigest()
 
-        async with aiofiles.open(f"/debug/{name.lower()}.json", mode='w') as f:
-            await f.write(content)
+                if self._debug_files.get(file_name) == content_hash:
+                    return
+
+                self._debug_files[file_name] = content_hash
+
+            file_path = f"{DEBUG_DIR}/{file_name}.json"
+
+            if self._configuration.debug_dump_format == DEBUG_DUMP_FORMAT_GZIP:
+                content = await loop.run_in_executor(None, gzip.compress, content)
+                file_path = f"{file_path}.gz"
+
+            async with aiofiles.open(file_path, mode='wb') as f:
+                await f.write(content)
+
+            self._metrics.observe(METRIC_STAGE_DURATION, time.perf_counter() - started, stage=STAGE_DEBUG_DUMP)
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to save debug file {name} due to error: {ex} [LN: {line}]")
 
     @staticmethod
     async def _get_debug_file(name):
-        async with aiofiles.open(f"/debug/{name.lower()}.json", mode='r') as f:
-            content = await f.read()
+        file_path = f"{DEBUG_DIR}/{name.lower()}.json"
+
+        if os.path.exists(f"{file_path}.gz"):
+            async with aiofiles.open(f"{file_path}.gz", mode='rb') as f:
+                content = gzip.decompress(await f.read())
+
+        else:
+            async with aiofiles.open(file_path, mode='rb') as f:
+                content = await f.read()
 
-            data = json.loads(content)
+        data = JsonParser.loads(content)
 
-            return data
+        return data
 
-    async def load_ozw_device(self, device) -> Optional[int]:
-        message_id = None
+    async def load_ozw_device(self, device) -> Optional[dict]:
+        result = None
 
         try:
             node_id = device.get("NodeID")
             instance_id = device.get("InstanceID")
 
             if instance_id == 1:
-                self._ws_counter += 1
-
-                message_id = self._ws_counter
-
                 device_status = {
-                    "id": self._ws_counter,
                     "type": "ozw/node_status",
-                    "ozw_instance": instance_id,
+                    "ozw_instance": device.get("ControllerID"),
                     "node_id": node_id
                 }
 
-                await self._ws.send(json.dumps(device_status))
+                response = await self._send_request(device_status, self._configuration.ozw_request_timeout)
+
+                if response is not None and self._is_valid(response):
+                    result = response.get("result")
+
+                    _LOGGER.debug(f"Processing OZW device {node_id}")
+
+                    await self._save_debug_file(self._get_ozw_status_name(device), result)
+
+                    device["OZWStatus"] = result
+
+                    self._ozw_statuses[self._get_ozw_key(device)] = (time.monotonic(), result)
+
         except Exception as ex:
             trace_back = sys.exc_info()[2]
             line = trace_back.tb_lineno
 
             _LOGGER.error(f"Failed to load OZW device {device} due to error: {ex} [LN: {line}]")
 
-        return message_id
+        return result
+
+    @staticmethod
+    def _get_ozw_status_name(device: dict) -> str:
+        controller_id = device.get("ControllerID")
+        node_id = device.get("NodeID")
+
+        return f"OZWStatus_{node_id}" if controller_id == 1 else f"OZWStatus_{controller_id}_{node_id}"
 
     @staticmethod
-    def get_message_id(controller_id, node_id, instance_id):
-        return (controller_id * 1000000) + (node_id * 10000) + (instance_id * 10)
+    def _get_ozw_key(device: dict) -> Tuple[int, int, int]:
+        return device.get("ControllerID"), device.get("NodeID"), device.get("InstanceID")
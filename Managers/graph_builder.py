@@ -0,0 +1,228 @@
+import logging
+import multiprocessing
+import os
+import sys
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from models.consts import *
+from models.node import Node
+from models.node_graph import NodeGraph
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_graph(nodes: List[Node]) -> Optional[NodeGraph]:
+    return GraphBuilder().build(nodes)
+
+
+class GraphBuilder:
+    def __init__(self, workers: int = GRAPH_WORKERS):
+        self._workers = workers if workers > 0 else os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        if self._workers > 1 and multiprocessing.current_process().daemon:
+            _LOGGER.warning(f"Daemonic process {multiprocessing.current_process().name} cannot start graph workers, "
+                            f"building graphs serially")
+
+            self._workers = 1
+
+    def build_all(self, controller_nodes: Dict[str, List[Node]]) -> Dict[str, NodeGraph]:
+        built_graphs = None
+
+        if len(controller_nodes) > 1 and self._workers > 1:
+            try:
+                built_graphs = self._build_parallel(controller_nodes)
+
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                _LOGGER.error(f"Failed to build graphs in parallel, building serially from now on, "
+                              f"error: {ex} [LN: {line}]")
+
+                self._shutdown()
+
+                self._workers = 1
+
+        if built_graphs is None:
+            built_graphs = {controller: self.build(nodes) for controller, nodes in controller_nodes.items()}
+
+        graphs = {}
+
+        for controller, graph in built_graphs.items():
+            if graph is None:
+                _LOGGER.warning(f"No hub found for controller {controller}")
+
+            else:
+                graphs[controller] = graph
+
+        return graphs
+
+    def build(self, nodes: List[Node]) -> Optional[NodeGraph]:
+        nodes_index: Dict[int, int] = {}
+
+        for index in range(len(nodes)):
+            nodes_index.setdefault(nodes[index].id, index)
+
+        hub_index = self._get_hub_index(nodes)
+
+        if hub_index is None or nodes[hub_index].neighbors is None:
+            return None
+
+        adjacency: List[List[int]] = [[] for _ in nodes]
+        edge_targets: List[set] = [set() for _ in nodes]
+
+        for index in range(len(nodes)):
+            self._update_edges(index, hub_index, nodes, nodes_index, adjacency, edge_targets)
+
+        self._update_hops(nodes, nodes_index, adjacency)
+
+        graph = NodeGraph()
+        graph.nodes = tuple(nodes)
+
+        for index in range(len(nodes)):
+            graph.targets.extend(adjacency[index])
+            graph.types.extend(self._get_relation_types(index, nodes, nodes_index, adjacency))
+            graph.offsets.append(len(graph.targets))
+
+        return graph
+
+    def _build_parallel(self, controller_nodes: Dict[str, List[Node]]) -> Dict[str, Optional[NodeGraph]]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=min(self._workers, len(controller_nodes)),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+
+        futures = {controller: self._executor.submit(build_graph, nodes)
+                   for controller, nodes in controller_nodes.items()}
+
+        graphs = {}
+
+        for controller, future in futures.items():
+            graph = future.result()
+
+            if graph is not None:
+                nodes = controller_nodes[controller]
+
+                for index in range(len(nodes)):
+                    nodes[index].hop = graph.nodes[index].hop
+
+                graph.nodes = tuple(nodes)
+
+            graphs[controller] = graph
+
+        return graphs
+
+    def _shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+            self._executor = None
+
+    @staticmethod
+    def _get_hub_index(nodes: List[Node]) -> Optional[int]:
+        for index in range(len(nodes)):
+            if nodes[index].isPrimary:
+                return index
+
+        return None
+
+    @staticmethod
+    def _add_edge(index: int, to_node_id: int, adjacency: List[List[int]], edge_targets: List[set]):
+        adjacency[index].append(to_node_id)
+        edge_targets[index].add(to_node_id)
+
+    def _update_edges(self,
+                      index: int,
+                      hub_index: int,
+                      nodes: List[Node],
+                      nodes_index: Dict[int, int],
+                      adjacency: List[List[int]],
+                      edge_targets: List[set]):
+        try:
+            node = nodes[index]
+            hub = nodes[hub_index]
+            neighbors = node.neighbors
+
+            if neighbors is None:
+                _LOGGER.debug("Associate nodes W/O neighbors: %s --> %s", node.id, hub.id)
+
+                self._add_edge(index, hub.id, adjacency, edge_targets)
+
+                if node.id not in edge_targets[hub_index]:
+                    _LOGGER.debug("Associate reverse nodes W/O neighbors: %s --> %s", hub.id, node.id)
+
+                    self._add_edge(hub_index, node.id, adjacency, edge_targets)
+            else:
+                for neighbor_id in neighbors:
+                    neighbor_index = nodes_index.get(neighbor_id)
+
+                    if neighbor_index is not None:
+                        _LOGGER.debug("Associate nodes: %s --> %s", node.id, neighbor_id)
+
+                        self._add_edge(index, neighbor_id, adjacency, edge_targets)
+
+                        if node.id not in edge_targets[neighbor_index]:
+                            _LOGGER.debug("Associate reverse nodes: %s --> %s", neighbor_id, node.id)
+
+                            self._add_edge(neighbor_index, node.id, adjacency, edge_targets)
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to update edges due to error: {ex} [LN: {line}]")
+
+    @staticmethod
+    def _update_hops(nodes: List[Node], nodes_index: Dict[int, int], adjacency: List[List[int]]):
+        try:
+            queue = deque([index for index in range(len(nodes)) if nodes[index].hop == 0])
+
+            while len(queue) > 0:
+                index = queue.popleft()
+                node = nodes[index]
+                next_hop = node.hop + 1
+
+                _LOGGER.debug("Processing node %s, HOP:%s", node.id, node.hop)
+
+                for to_node_id in adjacency[index]:
+                    to_index = nodes_index.get(to_node_id)
+
+                    if to_index is not None and nodes[to_index].hop == -1:
+                        nodes[to_index].hop = next_hop
+
+                        _LOGGER.debug("Changed HOP of nested node %s to %s", to_node_id, next_hop)
+
+                        queue.append(to_index)
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to update hops due to error: {ex} [LN: {line}]")
+
+    @staticmethod
+    def _get_relation_types(index: int,
+                            nodes: List[Node],
+                            nodes_index: Dict[int, int],
+                            adjacency: List[List[int]]) -> List[int]:
+        node = nodes[index]
+        relation_types = []
+
+        for to_node_id in adjacency[index]:
+            to_node = nodes[nodes_index[to_node_id]]
+
+            edge_type = EDGE_TYPE_CHILD
+
+            if node.hop == to_node.hop:
+                edge_type = EDGE_TYPE_SIBLING
+
+            elif node.hop < to_node.hop and not to_node.isPrimary:
+                edge_type = EDGE_TYPE_PARENT
+
+            _LOGGER.debug("Update relation of node %s to node %s, Type: %s, HOP: %s", node.id, to_node_id, edge_type, node.hop)
+
+            relation_types.append(EDGE_TYPES.index(edge_type))
+
+        return relation_types
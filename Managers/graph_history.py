@@ -0,0 +1,178 @@
+import json
+import logging
+
+from typing import Dict, List, Optional, Tuple
+
+from models.consts import *
+from models.nodes_snapshot import NodesSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+NODE_KEY_FIELDS = ["id", "instanceId", "controller"]
+EDGE_KEY_FIELDS = ["id", "toNodeId", "controller"]
+
+
+class GraphHistory:
+    def __init__(self, size: int = GRAPH_HISTORY_SIZE):
+        self._size = size
+        self._generation: Optional[int] = None
+        self._items: Optional[Tuple[Dict[str, dict], Dict[str, dict]]] = None
+        self._steps: Dict[int, bytes] = {}
+        self._deltas: Dict[Tuple[int, int, Optional[str]], bytes] = {}
+
+    def add(self, generation: int, items: List[dict], max_length: int):
+        current_items = self._get_graph_items(items)
+        steps = {}
+
+        if self._items is not None and self._generation == generation - 1:
+            step = {
+                "nodes": self._get_items_changes(self._items[0], current_items[0]),
+                "edges": self._get_items_changes(self._items[1], current_items[1])
+            }
+
+            steps[generation] = json.dumps(step).encode("utf-8")
+            steps_length = len(steps[generation])
+
+            for step_generation in range(generation - 1, generation - self._size, -1):
+                step_content = self._steps.get(step_generation)
+
+                if step_content is None:
+                    break
+
+                steps_length += len(step_content)
+
+                if steps_length > max_length:
+                    break
+
+                steps[step_generation] = step_content
+
+        self._generation = generation
+        self._items = current_items
+        self._steps = steps
+        self._deltas = {}
+
+    def get_steps(self) -> Dict[int, bytes]:
+        return self._steps
+
+    def set_steps(self, steps: Dict[int, bytes]):
+        self._steps = steps
+        self._deltas = {}
+
+    def get_delta(self, since: int, snapshot: NodesSnapshot, controller: Optional[str] = None) -> bytes:
+        delta_key = (since, snapshot.generation, controller)
+
+        deltas = self._deltas
+        steps = self._steps
+
+        content = deltas.get(delta_key)
+
+        if content is None:
+            generations = range(since + 1, snapshot.generation + 1)
+
+            if since > snapshot.generation or any(generation not in steps for generation in generations):
+                header = f'{{"generation": {snapshot.generation}, "since": {since}, "full": true, "nodes": '
+
+                if controller is None:
+                    content = header.encode("utf-8") + snapshot.content + b'}'
+
+                else:
+                    content = header.encode("utf-8") + snapshot.controllers_content.get(controller, b"[]") + b'}'
+
+            else:
+                nodes = {}
+                edges = {}
+
+                for generation in generations:
+                    step = json.loads(bytes(steps[generation]))
+
+                    self._apply_changes(nodes, step.get("nodes"), NODE_KEY_FIELDS)
+                    self._apply_changes(edges, step.get("edges"), EDGE_KEY_FIELDS)
+
+                delta = {
+                    "generation": snapshot.generation,
+                    "since": since,
+                    "full": False,
+                    "nodes": self._get_items_delta(nodes, NODE_KEY_FIELDS, controller),
+                    "edges": self._get_items_delta(edges, EDGE_KEY_FIELDS, controller)
+                }
+
+                content = json.dumps(delta).encode("utf-8")
+
+                deltas[delta_key] = content
+
+        return content
+
+    @staticmethod
+    def _get_graph_items(items: List[dict]) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        nodes = {}
+        edges = {}
+
+        for item in items:
+            controller = item.get("controller")
+            node_key = f"{controller}.{item.get('id')}.{item.get('instanceId')}"
+
+            if node_key in nodes:
+                continue
+
+            node = dict(item)
+            node_edges = node.pop("edges")
+
+            nodes[node_key] = node
+
+            for edge in node_edges:
+                edges[f"{controller}.{edge.get('id')}-{edge.get('toNodeId')}"] = dict(edge, controller=controller)
+
+        return nodes, edges
+
+    @staticmethod
+    def _get_items_changes(previous_items: Dict[str, dict], current_items: Dict[str, dict]) -> List[list]:
+        changes = []
+
+        for key, item in current_items.items():
+            previous_item = previous_items.get(key)
+
+            if previous_item != item:
+                changes.append([previous_item, item])
+
+        for key, item in previous_items.items():
+            if key not in current_items:
+                changes.append([item, None])
+
+        return changes
+
+    @staticmethod
+    def _apply_changes(changes: Dict[tuple, tuple], step_changes: List[list], key_fields: List[str]):
+        for previous_item, item in step_changes:
+            key_item = previous_item if item is None else item
+            key = tuple(key_item.get(field) for field in key_fields)
+
+            change = changes.get(key)
+
+            changes[key] = (previous_item if change is None else change[0], item)
+
+    @staticmethod
+    def _get_items_delta(changes: Dict[tuple, tuple], key_fields: List[str], controller: Optional[str]) -> dict:
+        added = []
+        changed = []
+        removed = []
+
+        for previous_item, item in changes.values():
+            key_item = previous_item if item is None else item
+
+            if previous_item == item or controller is not None and key_item.get("controller") != controller:
+                continue
+
+            if previous_item is None:
+                added.append(item)
+
+            elif item is None:
+                removed.append({field: previous_item.get(field) for field in key_fields})
+
+            else:
+                changed.append(item)
+
+        return {
+            "added": added,
+            "changed": changed,
+            "removed": removed
+        }
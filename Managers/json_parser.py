@@ -0,0 +1,72 @@
+import json
+import re
+
+from typing import Callable, Optional, Set
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MESSAGE_ID_PATTERN = re.compile(r'\s*{\s*"id"\s*:\s*(\d+)')
+RESULT_ARRAY_PATTERN = re.compile(r'"result"\s*:\s*\[')
+ARRAY_SEPARATOR_PATTERN = re.compile(r'[\s,]*')
+
+
+class JsonParser:
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+
+    @property
+    def backend(self) -> str:
+        return "json" if orjson is None else "orjson"
+
+    @staticmethod
+    def loads(content):
+        if orjson is None:
+            return json.loads(content)
+
+        return orjson.loads(content)
+
+    @staticmethod
+    def get_message_id(message: str) -> Optional[int]:
+        match = MESSAGE_ID_PATTERN.match(message)
+
+        return None if match is None else int(match.group(1))
+
+    def get_result_filter(self, key: str, values: Set[str]) -> Callable[[str], dict]:
+        def parse(message: str) -> dict:
+            return self.loads_filtered_result(message, key, values)
+
+        return parse
+
+    def loads_filtered_result(self, message: str, key: str, values: Set[str]) -> dict:
+        match = RESULT_ARRAY_PATTERN.search(message)
+
+        if match is None:
+            data = self.loads(message)
+            result = data.get("result")
+
+            if isinstance(result, list):
+                data["result"] = [item for item in result if isinstance(item, dict) and item.get(key) in values]
+
+            return data
+
+        items = []
+        position = match.end()
+
+        while True:
+            position = ARRAY_SEPARATOR_PATTERN.match(message, position).end()
+
+            if message[position] == "]":
+                break
+
+            item, position = self._decoder.raw_decode(message, position)
+
+            if isinstance(item, dict) and item.get(key) in values:
+                items.append(item)
+
+        data = self.loads(f'{message[:match.start()]}"result":null{message[position + 1:]}')
+        data["result"] = items
+
+        return data
@@ -0,0 +1,366 @@
+import json
+import logging
+import threading
+import time
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.node_graph import Topology
+from models.nodes_snapshot import NodesSnapshot
+
+try:
+    import numpy
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import maximum_flow, shortest_path
+except ImportError:
+    numpy = None
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class MeshAnalytics:
+    def __init__(self):
+        self._locks: Dict[str, threading.Lock] = {}
+
+        self._analytics: Dict[str, Tuple[Topology, dict]] = {}
+        self._contents: Dict[str, Tuple[int, bytes]] = {}
+
+    @property
+    def backend(self) -> str:
+        return "python" if numpy is None else "scipy"
+
+    def get_analytics(self, snapshot: NodesSnapshot, controller: str) -> bytes:
+        content = self._contents.get(controller)
+
+        if content is not None and content[0] == snapshot.generation:
+            return content[1]
+
+        with self._locks.setdefault(controller, threading.Lock()):
+            content = self._contents.get(controller)
+
+            if content is None or content[0] != snapshot.generation:
+                topology = self._get_topology(snapshot, controller)
+                analytics = self._analytics.get(controller)
+
+                if analytics is None or analytics[0] != topology:
+                    analytics = (topology, self._analyze(*topology))
+
+                    self._analytics[controller] = analytics
+
+                data = dict(analytics[1], generation=snapshot.generation, controller=controller)
+
+                content = (snapshot.generation, json.dumps(data).encode("utf-8"))
+
+                self._contents[controller] = content
+
+        return content[1]
+
+    @staticmethod
+    def _get_topology(snapshot: NodesSnapshot, controller: str) -> Topology:
+        topology_content = snapshot.topologies_content.get(controller)
+
+        if topology_content is None:
+            return snapshot.graph.get_topology(controller)
+
+        node_ids, hub_id, failed_node_ids, edges = json.loads(bytes(topology_content))
+
+        return tuple(node_ids), hub_id, tuple(failed_node_ids), tuple([tuple(edge) for edge in edges])
+
+    def _analyze(self,
+                 node_ids: Tuple[int, ...],
+                 hub_id: Optional[int],
+                 failed_node_ids: Tuple[int, ...],
+                 edges: Tuple[Tuple[int, int], ...]) -> dict:
+        started = time.perf_counter()
+
+        failed_nodes = set(failed_node_ids)
+        active_node_ids = [node_id for node_id in node_ids if node_id not in failed_nodes]
+
+        indexes = {node_id: index for index, node_id in enumerate(active_node_ids)}
+        pairs = [(indexes[node_id], indexes[to_node_id]) for node_id, to_node_id in edges
+                 if node_id in indexes and to_node_id in indexes]
+        hub = indexes.get(hub_id)
+
+        adjacency: List[Set[int]] = [set() for _ in active_node_ids]
+
+        for index, to_index in pairs:
+            adjacency[index].add(to_index)
+            adjacency[to_index].add(index)
+
+        if numpy is None:
+            hops = self._get_hops(adjacency)
+            routes = self._get_routes(adjacency, hub)
+
+        else:
+            hops = self._get_hops_sparse(len(active_node_ids), pairs)
+            routes = self._get_routes_sparse(len(active_node_ids), pairs, hub)
+
+        articulation_points, bridges, components = self._get_cut_vertices(adjacency)
+
+        nodes = []
+        diameter = 0
+        total_hops = 0
+        connected_pairs = 0
+
+        for node_id in node_ids:
+            index = indexes.get(node_id)
+
+            if index is None:
+                nodes.append({
+                    "id": node_id,
+                    "isFailed": True,
+                    "degree": None,
+                    "hopsToHub": None,
+                    "routes": None,
+                    "eccentricity": None,
+                    "isArticulationPoint": False
+                })
+
+                continue
+
+            reachable_hops = [value for value in hops[index] if value > 0]
+
+            eccentricity = max(reachable_hops, default=0)
+            diameter = max(diameter, eccentricity)
+            total_hops += sum(reachable_hops)
+            connected_pairs += len(reachable_hops)
+
+            nodes.append({
+                "id": node_id,
+                "isFailed": False,
+                "degree": len(adjacency[index]),
+                "hopsToHub": None if hub is None else hops[index][hub],
+                "routes": routes[index],
+                "eccentricity": eccentricity,
+                "isArticulationPoint": index in articulation_points
+            })
+
+        duration = time.perf_counter() - started
+
+        _LOGGER.info(f"Mesh analytics of {len(active_node_ids)} active nodes, {len(pairs)} edges "
+                     f"calculated in {duration:.3f} seconds ({self.backend})")
+
+        return {
+            "generation": None,
+            "controller": None,
+            "backend": self.backend,
+            "duration": duration,
+            "hubId": hub_id,
+            "components": components,
+            "diameter": diameter,
+            "averageHops": None if connected_pairs == 0 else total_hops / connected_pairs,
+            "failedNodes": list(failed_node_ids),
+            "articulationPoints": sorted([active_node_ids[index] for index in articulation_points]),
+            "bridges": sorted([sorted([active_node_ids[index], active_node_ids[to_index]])
+                               for index, to_index in bridges]),
+            "nodes": nodes,
+            "hopMatrix": {
+                "nodes": active_node_ids,
+                "hops": hops
+            }
+        }
+
+    @staticmethod
+    def _get_hops(adjacency: List[Set[int]]) -> List[List[int]]:
+        hops = []
+
+        for source in range(len(adjacency)):
+            distances = [-1] * len(adjacency)
+            distances[source] = 0
+
+            queue = [source]
+
+            for index in queue:
+                next_distance = distances[index] + 1
+
+                for to_index in adjacency[index]:
+                    if distances[to_index] < 0:
+                        distances[to_index] = next_distance
+                        queue.append(to_index)
+
+            hops.append(distances)
+
+        return hops
+
+    @staticmethod
+    def _get_hops_sparse(size: int, pairs: List[Tuple[int, int]]) -> List[List[int]]:
+        if size == 0:
+            return []
+
+        rows = [index for index, _ in pairs] + [to_index for _, to_index in pairs]
+        columns = [to_index for _, to_index in pairs] + [index for index, _ in pairs]
+
+        adjacency = csr_matrix((numpy.ones(len(rows)), (rows, columns)), shape=(size, size))
+
+        distances = shortest_path(adjacency, method="D", directed=False, unweighted=True)
+        distances[numpy.isinf(distances)] = -1
+
+        return distances.astype(numpy.int64).tolist()
+
+    @staticmethod
+    def _get_routes(adjacency: List[Set[int]], hub: Optional[int]) -> List[Optional[int]]:
+        if hub is None:
+            return [None] * len(adjacency)
+
+        heads = []
+        capacities = []
+        arcs: List[List[int]] = [[] for _ in range(len(adjacency) * 2)]
+
+        def add_arc(from_vertex: int, to_vertex: int, capacity: int):
+            arcs[from_vertex].append(len(heads))
+            heads.append(to_vertex)
+            capacities.append(capacity)
+
+            arcs[to_vertex].append(len(heads))
+            heads.append(from_vertex)
+            capacities.append(0)
+
+        for index in range(len(adjacency)):
+            add_arc(index * 2, index * 2 + 1, len(adjacency) if index == hub else 1)
+
+            for to_index in adjacency[index]:
+                add_arc(index * 2 + 1, to_index * 2, 1)
+
+        source = hub * 2 + 1
+        routes = []
+
+        for target in range(len(adjacency)):
+            if target == hub:
+                routes.append(None)
+                continue
+
+            sink = target * 2
+            flows = [0] * len(heads)
+            count = 0
+            limit = min(len(adjacency[hub]), len(adjacency[target]))
+
+            while count < limit:
+                previous_arcs = [-1] * len(arcs)
+                stack = [source]
+
+                while len(stack) > 0 and previous_arcs[sink] < 0:
+                    vertex = stack.pop()
+
+                    for arc in arcs[vertex]:
+                        to_vertex = heads[arc]
+
+                        if to_vertex != source and previous_arcs[to_vertex] < 0 and capacities[arc] > flows[arc]:
+                            previous_arcs[to_vertex] = arc
+                            stack.append(to_vertex)
+
+                if previous_arcs[sink] < 0:
+                    break
+
+                vertex = sink
+
+                while vertex != source:
+                    arc = previous_arcs[vertex]
+
+                    flows[arc] += 1
+                    flows[arc ^ 1] -= 1
+
+                    vertex = heads[arc ^ 1]
+
+                count += 1
+
+            routes.append(count)
+
+        return routes
+
+    @staticmethod
+    def _get_routes_sparse(size: int, pairs: List[Tuple[int, int]], hub: Optional[int]) -> List[Optional[int]]:
+        if hub is None:
+            return [None] * size
+
+        rows = []
+        columns = []
+        capacities = []
+
+        for index in range(size):
+            rows.append(index * 2)
+            columns.append(index * 2 + 1)
+            capacities.append(size if index == hub else 1)
+
+        for index, to_index in pairs:
+            rows.extend([index * 2 + 1, to_index * 2 + 1])
+            columns.extend([to_index * 2, index * 2])
+            capacities.extend([1, 1])
+
+        split_graph = csr_matrix((numpy.array(capacities, dtype=numpy.int32), (rows, columns)),
+                                 shape=(size * 2, size * 2))
+        split_graph.sort_indices()
+
+        routes = []
+
+        for target in range(size):
+            if target == hub:
+                routes.append(None)
+
+            else:
+                routes.append(int(maximum_flow(split_graph, hub * 2 + 1, target * 2).flow_value))
+
+        return routes
+
+    @staticmethod
+    def _get_cut_vertices(adjacency: List[Set[int]]) -> Tuple[Set[int], List[Tuple[int, int]], int]:
+        discovery = [-1] * len(adjacency)
+        low = [0] * len(adjacency)
+        parents = [-1] * len(adjacency)
+
+        articulation_points = set()
+        bridges = []
+        components = 0
+        counter = 0
+
+        for root in range(len(adjacency)):
+            if discovery[root] >= 0:
+                continue
+
+            components += 1
+            root_children = 0
+
+            discovery[root] = low[root] = counter
+            counter += 1
+
+            stack = [(root, iter(adjacency[root]))]
+
+            while len(stack) > 0:
+                index, neighbors = stack[-1]
+                is_advanced = False
+
+                for to_index in neighbors:
+                    if discovery[to_index] < 0:
+                        parents[to_index] = index
+                        discovery[to_index] = low[to_index] = counter
+                        counter += 1
+
+                        if index == root:
+                            root_children += 1
+
+                        stack.append((to_index, iter(adjacency[to_index])))
+                        is_advanced = True
+
+                        break
+
+                    if to_index != parents[index]:
+                        low[index] = min(low[index], discovery[to_index])
+
+                if is_advanced:
+                    continue
+
+                stack.pop()
+
+                if len(stack) > 0:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[index])
+
+                    if low[index] > discovery[parent]:
+                        bridges.append((parent, index))
+
+                    if parent != root and low[index] >= discovery[parent]:
+                        articulation_points.add(parent)
+
+            if root_children > 1:
+                articulation_points.add(root)
+
+        return articulation_points, bridges, components
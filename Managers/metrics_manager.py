@@ -0,0 +1,106 @@
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from models.consts import *
+
+MetricLabels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self._histograms: Dict[str, Dict[MetricLabels, List[float]]] = {}
+        self._values: Dict[str, Dict[MetricLabels, float]] = {}
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(labels.items())
+
+        with self._lock:
+            metric = self._histograms.setdefault(name, {})
+            values = metric.get(key)
+
+            if values is None:
+                values = [0] * (len(METRICS_DURATION_BUCKETS) + 2)
+                metric[key] = values
+
+            for index in range(len(METRICS_DURATION_BUCKETS)):
+                if value <= METRICS_DURATION_BUCKETS[index]:
+                    values[index] += 1
+
+            values[-2] += value
+            values[-1] += 1
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = tuple(labels.items())
+
+        with self._lock:
+            metric = self._values.setdefault(name, {})
+            metric[key] = metric.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = tuple(labels.items())
+
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    @contextmanager
+    def measure(self, name: str, **labels):
+        started = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            for name, metric in self._values.items():
+                self._add_header(lines, name)
+
+                for key, value in metric.items():
+                    lines.append(f"{name}{self._get_labels(key)} {value}")
+
+            for name, metric in self._histograms.items():
+                self._add_header(lines, name)
+
+                for key, values in metric.items():
+                    for index in range(len(METRICS_DURATION_BUCKETS)):
+                        bucket_key = key + (("le", str(METRICS_DURATION_BUCKETS[index])),)
+
+                        lines.append(f"{name}_bucket{self._get_labels(bucket_key)} {values[index]}")
+
+                    lines.append(f"{name}_bucket{self._get_labels(key + (('le', '+Inf'),))} {values[-1]}")
+                    lines.append(f"{name}_sum{self._get_labels(key)} {values[-2]}")
+                    lines.append(f"{name}_count{self._get_labels(key)} {values[-1]}")
+
+        lines.append("")
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _add_header(lines: List[str], name: str):
+        metric_type, metric_help = METRICS.get(name, (METRIC_TYPE_GAUGE, name))
+
+        lines.append(f"# HELP {name} {metric_help}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @staticmethod
+    def _get_labels(key: MetricLabels) -> str:
+        if len(key) == 0:
+            return ""
+
+        labels = []
+
+        for label, value in key:
+            value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+            labels.append(f"{label}=\"{value}\"")
+
+        return f"{{{','.join(labels)}}}"
@@ -0,0 +1,153 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, List
+
+from models.consts import *
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProfilingManager:
+    def __init__(self, top: int = PROFILING_TOP, targets: List[str] = None, output_dir: str = DEBUG_DIR):
+        self._top = top
+        self._targets = PROFILE_TARGETS if targets is None else targets
+        self._output_dir = output_dir
+
+        self._pending: Dict[str, int] = {}
+        self._capture_lock = threading.Lock()
+        self._captures = 0
+        self._files = deque(maxlen=PROFILING_FILES)
+        self._idle = nullcontext()
+
+    def start(self, target: str, count: int = PROFILING_COUNT):
+        if target not in self._targets:
+            raise Exception(f"Profile target {target} is not supported, supported values: {self._targets}")
+
+        self._pending[target] = min(max(count, 1), PROFILING_MAX_COUNT)
+
+        _LOGGER.info(f"Profiling {target}, next {self._pending[target]} captures")
+
+    def stop(self, target: str):
+        self._pending.pop(target, None)
+
+    def capture(self, target: str):
+        if self._pending.get(target, 0) == 0:
+            return self._idle
+
+        return self._capture(target)
+
+    def get_status(self) -> dict:
+        return {
+            "pending": {target: count for target, count in self._pending.items() if count > 0},
+            "files": list(self._files)
+        }
+
+    @contextmanager
+    def _capture(self, target: str):
+        if not self._capture_lock.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            self._pending[target] = self._pending.get(target, 1) - 1
+            self._captures += 1
+
+            profiler = cProfile.Profile()
+            is_tracing = not tracemalloc.is_tracing()
+
+            if is_tracing:
+                tracemalloc.start()
+
+            started = time.perf_counter()
+            profiler.enable()
+
+            try:
+                yield
+
+            finally:
+                profiler.disable()
+
+                duration = time.perf_counter() - started
+                memory_snapshot = None
+                memory_peak = 0
+
+                if is_tracing:
+                    memory_snapshot = tracemalloc.take_snapshot()
+                    memory_peak = tracemalloc.get_traced_memory()[1]
+
+                    tracemalloc.stop()
+
+                self._save(target, profiler, duration, memory_snapshot, memory_peak)
+
+        finally:
+            self._capture_lock.release()
+
+    def _save(self, target: str, profiler: cProfile.Profile, duration: float, memory_snapshot, memory_peak: int):
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            file_name = f"profile_{target}_{timestamp}_{self._captures}"
+            file_path = f"{self._output_dir}/{file_name}"
+
+            os.makedirs(self._output_dir, exist_ok=True)
+
+            profiler.dump_stats(f"{file_path}.prof")
+
+            with open(f"{file_path}.txt", "w") as f:
+                f.write("\n".join(self._get_report(target, profiler, duration, memory_snapshot, memory_peak)))
+
+            self._files.append(file_name)
+
+            _LOGGER.info(f"Profile of {target} saved to {file_path}.prof / .txt, duration: {duration:.3f}s")
+
+        except Exception as ex:
+            trace_back = sys.exc_info()[2]
+            line = trace_back.tb_lineno
+
+            _LOGGER.error(f"Failed to save profile of {target} due to error: {ex} [LN: {line}]")
+
+    def _get_report(self,
+                    target: str,
+                    profiler: cProfile.Profile,
+                    duration: float,
+                    memory_snapshot,
+                    memory_peak: int) -> List[str]:
+        stats_content = io.StringIO()
+
+        stats = pstats.Stats(profiler, stream=stats_content)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILING_STATS_LINES)
+
+        lines = [
+            f"Target: {target}",
+            f"Duration: {duration:.6f}s",
+            f"Process: {os.getpid()}, thread: {threading.current_thread().name}",
+            "",
+            "CPU (cProfile, thread of the profiled cycle, sorted by cumulative time)",
+            stats_content.getvalue()
+        ]
+
+        if memory_snapshot is None:
+            lines.append("Allocations: not captured, tracemalloc was already tracing")
+
+        else:
+            statistics = memory_snapshot.statistics("lineno")
+
+            lines.append(f"Allocations (tracemalloc, all threads), peak: {memory_peak / 1024:.1f} KiB, "
+                         f"retained: {sum([stat.size for stat in statistics]) / 1024:.1f} KiB")
+
+            for stat in statistics[:self._top]:
+                lines.append(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {stat.traceback}")
+
+        lines.append("")
+
+        return lines
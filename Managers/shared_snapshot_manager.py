@@ -0,0 +1,264 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from Managers.graph_history import GraphHistory
+from models.consts import *
+from models.nodes_snapshot import NodesSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"HAZWSNAP"
+SNAPSHOT_VERSION = 4
+
+# Magic, version, generation, last modified (timestamp), index length
+SNAPSHOT_HEADER = struct.Struct("<8sIQdI")
+
+
+class SharedSnapshotWriter:
+    def __init__(self, path: str):
+        self._path = path
+        self._health_path = f"{path}.health"
+        self._metrics_path = f"{path}.metrics"
+
+    def publish(self,
+                snapshot: NodesSnapshot,
+                nodes_details: Dict[str, bytes],
+                deltas: Dict[int, bytes],
+                topologies: Dict[str, bytes]):
+        index = {
+            "etag": snapshot.etag,
+            "content": [0, len(snapshot.content)],
+            "stale": snapshot.is_stale,
+            "controllers": snapshot.controllers,
+            "controllersContent": {},
+            "nodes": {},
+            "deltas": {},
+            "topologies": {}
+        }
+
+        offset = len(snapshot.content)
+
+        for controller, controller_content in snapshot.controllers_content.items():
+            index["controllersContent"][controller] = [offset, len(controller_content)]
+
+            offset += len(controller_content)
+
+        for node_key, node_details in nodes_details.items():
+            index["nodes"][node_key] = [offset, len(node_details)]
+
+            offset += len(node_details)
+
+        for generation, delta in deltas.items():
+            index["deltas"][generation] = [offset, len(delta)]
+
+            offset += len(delta)
+
+        for controller, topology in topologies.items():
+            index["topologies"][controller] = [offset, len(topology)]
+
+            offset += len(topology)
+
+        index_content = json.dumps(index).encode("utf-8")
+
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC,
+                                      SNAPSHOT_VERSION,
+                                      snapshot.generation,
+                                      snapshot.last_modified.timestamp(),
+                                      len(index_content))
+
+        parts = [header, index_content, snapshot.content]
+        parts.extend(snapshot.controllers_content.values())
+        parts.extend(nodes_details.values())
+        parts.extend(deltas.values())
+        parts.extend(topologies.values())
+
+        self._write(self._path, parts)
+
+        _LOGGER.debug(f"Shared snapshot #{snapshot.generation} published, size: {offset} bytes")
+
+    def publish_health(self, health: dict):
+        self._write(self._health_path, [json.dumps(health).encode("utf-8")])
+
+    def publish_metrics(self, metrics: str):
+        self._write(self._metrics_path, [metrics.encode("utf-8")])
+
+    @staticmethod
+    def _write(path: str, parts):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as f:
+            for part in parts:
+                f.write(part)
+
+        os.replace(temp_path, path)
+
+
+class SharedSnapshotReader:
+    def __init__(self, path: str):
+        self._path = path
+        self._health_path = f"{path}.health"
+        self._metrics_path = f"{path}.metrics"
+        self._lock = threading.Lock()
+
+        self._file_id: Optional[Tuple[int, int, int]] = None
+        self._nodes_details: Tuple[Optional[mmap.mmap], Dict[str, Tuple[int, int]]] = (None, {})
+        self._graph_history = GraphHistory()
+
+        snapshot = NodesSnapshot()
+        snapshot.generation = 0
+        snapshot.content = b"[]"
+        snapshot.etag = "0"
+        snapshot.last_modified = datetime.now(timezone.utc)
+
+        self._nodes_snapshot = snapshot
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self._path)
+
+        except FileNotFoundError:
+            return
+
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        if file_id == self._file_id:
+            return
+
+        with self._lock:
+            if file_id == self._file_id:
+                return
+
+            try:
+                with open(self._path, "rb") as f:
+                    snapshot_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+                magic, version, generation, last_modified, index_length = SNAPSHOT_HEADER.unpack_from(snapshot_map)
+
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                    raise Exception(f"Unsupported snapshot format, version: {version}")
+
+                data_offset = SNAPSHOT_HEADER.size + index_length
+                index = json.loads(snapshot_map[SNAPSHOT_HEADER.size:data_offset])
+
+                snapshot_view = memoryview(snapshot_map)
+
+                content_offset, content_length = index.get("content")
+                content_offset += data_offset
+
+                snapshot = NodesSnapshot()
+                snapshot.generation = generation
+                snapshot.content = snapshot_view[content_offset:content_offset + content_length]
+                snapshot.etag = index.get("etag")
+                snapshot.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+                snapshot.is_stale = index.get("stale", False)
+                snapshot.controllers = index.get("controllers", [])
+
+                for controller, content_location in index.get("controllersContent", {}).items():
+                    controller_offset = content_location[0] + data_offset
+
+                    snapshot.controllers_content[controller] = \
+                        snapshot_view[controller_offset:controller_offset + content_location[1]]
+
+                for controller, topology_location in index.get("topologies", {}).items():
+                    topology_offset = topology_location[0] + data_offset
+
+                    snapshot.topologies_content[controller] = \
+                        snapshot_view[topology_offset:topology_offset + topology_location[1]]
+
+                nodes_index = {}
+
+                for node_key, node_location in index.get("nodes", {}).items():
+                    nodes_index[node_key] = (node_location[0] + data_offset, node_location[1])
+
+                deltas = {}
+
+                for delta_generation, delta_location in index.get("deltas", {}).items():
+                    delta_offset = delta_location[0] + data_offset
+
+                    deltas[int(delta_generation)] = snapshot_view[delta_offset:delta_offset + delta_location[1]]
+
+                self._graph_history.set_steps(deltas)
+
+                self._nodes_details = (snapshot_map, nodes_index)
+                self._nodes_snapshot = snapshot
+                self._file_id = file_id
+
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                _LOGGER.error(f"Failed to load shared snapshot due to error: {ex} [LN: {line}]")
+
+    def get_nodes_snapshot(self) -> NodesSnapshot:
+        self._refresh()
+
+        return self._nodes_snapshot
+
+    def get_nodes_delta(self, snapshot: NodesSnapshot, since: int, controller: Optional[str] = None) -> bytes:
+        return self._graph_history.get_delta(since, snapshot, controller)
+
+    def wait_for_nodes_snapshot(self, generation: int, timeout: float) -> NodesSnapshot:
+        deadline = time.monotonic() + timeout
+
+        snapshot = self.get_nodes_snapshot()
+
+        while snapshot.generation <= generation and time.monotonic() < deadline:
+            time.sleep(SHARED_SNAPSHOT_POLL_INTERVAL)
+
+            snapshot = self.get_nodes_snapshot()
+
+        return snapshot
+
+    def get_node_details(self,
+                         node_id: int,
+                         instance_id: int = 1,
+                         controller: Optional[str] = None) -> Optional[dict]:
+        self._refresh()
+
+        snapshot_map, nodes_index = self._nodes_details
+        controllers = [controller]
+
+        if controller is None:
+            controllers = [item.get("id") for item in self._nodes_snapshot.controllers]
+        node_location = None
+
+        for node_controller in controllers:
+            node_location = nodes_index.get(f"{node_id}.{instance_id}.{node_controller}")
+
+            if node_location is not None:
+                break
+
+        if snapshot_map is None or node_location is None:
+            return None
+
+        offset, length = node_location
+
+        return json.loads(snapshot_map[offset:offset + length])
+
+    def get_health(self) -> dict:
+        try:
+            with open(self._health_path, "rb") as f:
+                return json.loads(f.read())
+
+        except FileNotFoundError:
+            return {
+                "status": WEB_SOCKET_STATUS_DISCONNECTED,
+                "generation": self._nodes_snapshot.generation
+            }
+
+    def get_metrics(self) -> str:
+        try:
+            with open(self._metrics_path, "rb") as f:
+                return f.read().decode("utf-8")
+
+        except FileNotFoundError:
+            return ""
@@ -0,0 +1,56 @@
+import gzip
+import json
+import logging
+import os
+import time
+
+from typing import Optional
+
+from Managers.json_parser import JsonParser
+from models.consts import *
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotCacheManager:
+    def __init__(self, path: str):
+        self._path = path
+
+    def load(self) -> Optional[dict]:
+        if not os.path.exists(self._path):
+            _LOGGER.info(f"Snapshot cache {self._path} not found")
+
+            return None
+
+        with open(self._path, "rb") as f:
+            cache = JsonParser.loads(gzip.decompress(f.read()))
+
+        version = cache.get("version")
+
+        if version != SNAPSHOT_CACHE_VERSION:
+            _LOGGER.warning(f"Snapshot cache version {version} is not supported, ignoring {self._path}")
+
+            return None
+
+        return cache
+
+    def save(self, cache: dict) -> int:
+        cache["version"] = SNAPSHOT_CACHE_VERSION
+        cache["saved"] = time.time()
+
+        content = json.dumps(cache, separators=(",", ":")).encode("utf-8")
+        content = gzip.compress(content, compresslevel=SNAPSHOT_CACHE_COMPRESS_LEVEL)
+
+        cache_dir = os.path.dirname(self._path)
+
+        if cache_dir != "":
+            os.makedirs(cache_dir, exist_ok=True)
+
+        temp_path = f"{self._path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "wb") as f:
+            f.write(content)
+
+        os.replace(temp_path, self._path)
+
+        return len(content)
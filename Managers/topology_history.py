@@ -0,0 +1,435 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.consts import *
+from models.node_graph import NodeGraph
+
+_LOGGER = logging.getLogger(__name__)
+
+NodeKey = Tuple[str, int, int]
+EdgeKey = Tuple[str, int, int, int]
+
+TOPOLOGY_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    bucket INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    controller TEXT NOT NULL,
+    node_id INTEGER NOT NULL,
+    instance_id INTEGER NOT NULL,
+    change INTEGER NOT NULL,
+    target INTEGER,
+    value NUMERIC
+);
+CREATE INDEX IF NOT EXISTS changes_bucket ON changes (bucket, timestamp);
+CREATE INDEX IF NOT EXISTS changes_controller_node ON changes (controller, node_id, instance_id, bucket, timestamp);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    timestamp REAL PRIMARY KEY,
+    content BLOB NOT NULL
+);
+"""
+
+
+class TopologyHistory:
+    def __init__(self, path: str, retention: int = TOPOLOGY_HISTORY_RETENTION):
+        self._path = path
+        self._retention = retention * 86400
+
+        self._queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+        self._nodes: Dict[NodeKey, Dict[int, object]] = {}
+        self._edges: Set[EdgeKey] = set()
+        self._samples: Dict[NodeKey, float] = {}
+        self._checkpoint_time: Optional[float] = None
+        self._purge_time = 0
+        self._is_loaded = False
+
+    def start(self):
+        self._writer = threading.Thread(target=self._write_changes, name="topology-history", daemon=True)
+        self._writer.start()
+
+    def record(self, graph: NodeGraph):
+        if self._writer is None or len(graph.nodes) == 0:
+            return
+
+        self._queue.put((time.time(), graph))
+
+    def get_graph(self, timestamp: float, controller: Optional[str]) -> dict:
+        nodes: Dict[NodeKey, Dict[int, object]] = {}
+        edges: Set[EdgeKey] = set()
+        checkpoint_time = None
+
+        if os.path.exists(self._path):
+            connection = self._connect(is_read_only=True)
+
+            try:
+                if self._get_version(connection) == TOPOLOGY_HISTORY_VERSION:
+                    nodes, edges, checkpoint_time = self._get_state(connection, timestamp)
+
+            finally:
+                connection.close()
+
+        node_edges: Dict[NodeKey, List[int]] = {}
+
+        for edge_controller, node_id, instance_id, target in sorted(edges):
+            if edge_controller == controller:
+                node_edges.setdefault((edge_controller, node_id, instance_id), []).append(target)
+
+        items = []
+
+        for node_key in sorted([node_key for node_key in nodes.keys() if node_key[0] == controller]):
+            item = {
+                "id": node_key[1],
+                "instanceId": node_key[2]
+            }
+
+            for change, attribute in TOPOLOGY_NODE_ATTRIBUTES.items():
+                item[attribute] = self._get_output_value(change, nodes[node_key].get(change))
+
+            item["edges"] = node_edges.get(node_key, [])
+
+            items.append(item)
+
+        return {
+            "time": self._get_time(timestamp),
+            "checkpoint": None if checkpoint_time is None else self._get_time(checkpoint_time),
+            "controller": controller,
+            "nodes": items
+        }
+
+    def get_node_changes(self,
+                         node_id: int,
+                         instance_id: int,
+                         controller: Optional[str],
+                         start: float,
+                         end: float) -> dict:
+        rows = []
+
+        if os.path.exists(self._path):
+            connection = self._connect(is_read_only=True)
+
+            try:
+                if self._get_version(connection) == TOPOLOGY_HISTORY_VERSION:
+                    rows = connection.execute("SELECT timestamp, change, target, value FROM changes "
+                                              "WHERE controller = ? AND node_id = ? AND instance_id = ? "
+                                              "AND bucket BETWEEN ? AND ? AND timestamp BETWEEN ? AND ? "
+                                              "ORDER BY timestamp, rowid LIMIT ?",
+                                              (controller,
+                                               node_id,
+                                               instance_id,
+                                               self._get_bucket(start),
+                                               self._get_bucket(end),
+                                               start,
+                                               end,
+                                               TOPOLOGY_HISTORY_MAX_CHANGES)).fetchall()
+
+            finally:
+                connection.close()
+
+        changes = []
+
+        for timestamp, change, target, value in rows:
+            item = {
+                "time": self._get_time(timestamp),
+                "type": TOPOLOGY_CHANGES.get(change)
+            }
+
+            if change in [TOPOLOGY_CHANGE_EDGE_ADDED, TOPOLOGY_CHANGE_EDGE_REMOVED]:
+                item["toNodeId"] = target
+
+            elif change in TOPOLOGY_NODE_ATTRIBUTES:
+                item["value"] = self._get_output_value(change, value)
+
+            changes.append(item)
+
+        return {
+            "id": node_id,
+            "instanceId": instance_id,
+            "controller": controller,
+            "from": self._get_time(start),
+            "to": self._get_time(end),
+            "truncated": len(changes) == TOPOLOGY_HISTORY_MAX_CHANGES,
+            "changes": changes
+        }
+
+    def _write_changes(self):
+        connection = None
+        rows = []
+        flushed = time.monotonic()
+
+        while True:
+            try:
+                if connection is None:
+                    connection = self._connect()
+
+                    self._is_loaded = False
+
+                checkpoint_time = None
+
+                try:
+                    timestamp, graph = self._queue.get(timeout=TOPOLOGY_HISTORY_FLUSH_INTERVAL)
+
+                    if not self._is_loaded:
+                        self._load(connection)
+
+                    rows.extend(self._get_changes(timestamp, graph))
+
+                    if self._checkpoint_time is None or \
+                            timestamp - self._checkpoint_time >= TOPOLOGY_HISTORY_CHECKPOINT_INTERVAL:
+                        checkpoint_time = timestamp
+
+                except queue.Empty:
+                    pass
+
+                is_flush_required = len(rows) >= TOPOLOGY_HISTORY_BATCH_SIZE or \
+                    time.monotonic() - flushed >= TOPOLOGY_HISTORY_FLUSH_INTERVAL
+
+                if checkpoint_time is not None or (len(rows) > 0 and is_flush_required):
+                    self._flush(connection, rows, checkpoint_time)
+
+                    rows = []
+                    flushed = time.monotonic()
+
+            except Exception as ex:
+                trace_back = sys.exc_info()[2]
+                line = trace_back.tb_lineno
+
+                _LOGGER.error(f"Failed to write topology history due to error: {ex} [LN: {line}]")
+
+                if connection is not None:
+                    connection.close()
+
+                connection = None
+                rows = []
+
+                time.sleep(TOPOLOGY_HISTORY_FLUSH_INTERVAL)
+
+    def _load(self, connection: sqlite3.Connection):
+        self._nodes, self._edges, self._checkpoint_time = self._get_state(connection, time.time())
+        self._is_loaded = True
+
+        _LOGGER.info(f"Topology history loaded, nodes: {len(self._nodes)}, edges: {len(self._edges)}")
+
+    def _flush(self, connection: sqlite3.Connection, rows: list, checkpoint_time: Optional[float]):
+        with connection:
+            connection.executemany("INSERT INTO changes "
+                                   "(bucket, timestamp, controller, node_id, instance_id, change, target, value) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+            if checkpoint_time is not None:
+                connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)",
+                                   (checkpoint_time, self._get_checkpoint_content()))
+
+                self._checkpoint_time = checkpoint_time
+
+        _LOGGER.debug(f"Topology history saved {len(rows)} changes, checkpoint: {checkpoint_time is not None}")
+
+        self._purge(connection)
+
+    def _purge(self, connection: sqlite3.Connection):
+        now = time.time()
+
+        if now - self._purge_time < TOPOLOGY_HISTORY_PURGE_INTERVAL:
+            return
+
+        self._purge_time = now
+
+        with connection:
+            connection.execute("DELETE FROM checkpoints WHERE timestamp < ? "
+                               "AND timestamp < (SELECT MAX(timestamp) FROM checkpoints)", (now - self._retention,))
+
+            first_checkpoint_time = connection.execute("SELECT MIN(timestamp) FROM checkpoints").fetchone()[0]
+
+            if first_checkpoint_time is not None:
+                connection.execute("DELETE FROM changes WHERE bucket < ?", (self._get_bucket(first_checkpoint_time),))
+
+    def _get_changes(self, timestamp: float, graph: NodeGraph) -> list:
+        bucket = self._get_bucket(timestamp)
+
+        nodes: Dict[NodeKey, Dict[int, object]] = {}
+        edges: Set[EdgeKey] = set()
+
+        for index in range(len(graph.nodes)):
+            node = graph.nodes[index]
+            node_key = (node.controller, node.id, node.instanceId)
+
+            if node_key in nodes:
+                continue
+
+            nodes[node_key] = {change: self._get_value(getattr(node, attribute))
+                               for change, attribute in TOPOLOGY_NODE_ATTRIBUTES.items()}
+
+            for position in range(graph.offsets[index], graph.offsets[index + 1]):
+                edges.add(node_key + (graph.targets[position],))
+
+        rows = []
+
+        for node_key in self._nodes.keys() - nodes.keys():
+            rows.append((bucket, timestamp) + node_key + (TOPOLOGY_CHANGE_NODE_REMOVED, None, None))
+
+            self._samples.pop(node_key, None)
+
+        for node_key, attributes in nodes.items():
+            previous_attributes = self._nodes.get(node_key)
+
+            if previous_attributes is None:
+                rows.append((bucket, timestamp) + node_key + (TOPOLOGY_CHANGE_NODE_ADDED, None, None))
+
+                previous_attributes = {}
+
+            for change, value in attributes.items():
+                previous_value = previous_attributes.get(change)
+
+                if value == previous_value:
+                    continue
+
+                if change == TOPOLOGY_CHANGE_RTT:
+                    if timestamp - self._samples.get(node_key, 0) < TOPOLOGY_HISTORY_SAMPLE_INTERVAL:
+                        attributes[change] = previous_value
+                        continue
+
+                    self._samples[node_key] = timestamp
+
+                rows.append((bucket, timestamp) + node_key + (change, None, value))
+
+        for edge in edges - self._edges:
+            rows.append((bucket, timestamp) + edge[:3] + (TOPOLOGY_CHANGE_EDGE_ADDED, edge[3], None))
+
+        for edge in self._edges - edges:
+            rows.append((bucket, timestamp) + edge[:3] + (TOPOLOGY_CHANGE_EDGE_REMOVED, edge[3], None))
+
+        self._nodes = nodes
+        self._edges = edges
+
+        return rows
+
+    def _get_state(self, connection: sqlite3.Connection, timestamp: float):
+        nodes: Dict[NodeKey, Dict[int, object]] = {}
+        edges: Set[EdgeKey] = set()
+
+        checkpoint = connection.execute("SELECT timestamp, content FROM checkpoints WHERE timestamp <= ? "
+                                        "ORDER BY timestamp DESC LIMIT 1", (timestamp,)).fetchone()
+
+        if checkpoint is None:
+            return nodes, edges, None
+
+        checkpoint_time, content = checkpoint
+        checkpoint_content = json.loads(zlib.decompress(content))
+
+        for item in checkpoint_content.get("nodes", []):
+            nodes[(item[0], item[1], item[2])] = dict(zip(TOPOLOGY_NODE_ATTRIBUTES.keys(), item[3:]))
+
+        for item in checkpoint_content.get("edges", []):
+            edges.add((item[0], item[1], item[2], item[3]))
+
+        changes = connection.execute("SELECT controller, node_id, instance_id, change, target, value FROM changes "
+                                     "WHERE bucket BETWEEN ? AND ? AND timestamp > ? AND timestamp <= ? "
+                                     "ORDER BY timestamp, rowid",
+                                     (self._get_bucket(checkpoint_time),
+                                      self._get_bucket(timestamp),
+                                      checkpoint_time,
+                                      timestamp))
+
+        for controller, node_id, instance_id, change, target, value in changes:
+            node_key = (controller, node_id, instance_id)
+
+            if change == TOPOLOGY_CHANGE_NODE_ADDED:
+                nodes[node_key] = {}
+
+            elif change == TOPOLOGY_CHANGE_NODE_REMOVED:
+                nodes.pop(node_key, None)
+
+            elif change == TOPOLOGY_CHANGE_EDGE_ADDED:
+                edges.add(node_key + (target,))
+
+            elif change == TOPOLOGY_CHANGE_EDGE_REMOVED:
+                edges.discard(node_key + (target,))
+
+            elif node_key in nodes:
+                nodes[node_key][change] = value
+
+        return nodes, edges, checkpoint_time
+
+    def _get_checkpoint_content(self) -> bytes:
+        nodes = []
+
+        for node_key, attributes in self._nodes.items():
+            nodes.append(list(node_key) + [attributes.get(change) for change in TOPOLOGY_NODE_ATTRIBUTES])
+
+        content = {
+            "nodes": nodes,
+            "edges": [list(edge) for edge in self._edges]
+        }
+
+        return self._compress(content)
+
+    @staticmethod
+    def _compress(content: dict) -> bytes:
+        return zlib.compress(json.dumps(content, separators=(",", ":")).encode("utf-8"))
+
+    def _connect(self, is_read_only: bool = False) -> sqlite3.Connection:
+        if is_read_only:
+            return sqlite3.connect(f"file:{self._path}?mode=ro", uri=True)
+
+        history_dir = os.path.dirname(self._path)
+
+        if history_dir != "":
+            os.makedirs(history_dir, exist_ok=True)
+
+        connection = sqlite3.connect(self._path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        columns = [column[1] for column in connection.execute("PRAGMA table_info(changes)")]
+
+        if len(columns) == 0:
+            connection.execute(f"PRAGMA user_version = {TOPOLOGY_HISTORY_VERSION}")
+
+        connection.executescript(TOPOLOGY_HISTORY_SCHEMA)
+
+        return connection
+
+    @staticmethod
+    def _get_version(connection: sqlite3.Connection) -> int:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+
+    @staticmethod
+    def _get_value(value):
+        if isinstance(value, bool):
+            return int(value)
+
+        if isinstance(value, str):
+            try:
+                number = float(value)
+
+                return int(number) if number.is_integer() else number
+
+            except ValueError:
+                return value
+
+        return value
+
+    @staticmethod
+    def _get_output_value(change: int, value):
+        if change == TOPOLOGY_CHANGE_FAILED and value is not None:
+            return bool(value)
+
+        return value
+
+    @staticmethod
+    def _get_bucket(timestamp: float) -> int:
+        return int(timestamp // TOPOLOGY_HISTORY_BUCKET_SIZE)
+
+    @staticmethod
+    def _get_time(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
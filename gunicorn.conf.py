@@ -0,0 +1,30 @@
+from Managers.configuration_manager import ConfigurationManager
+from models.consts import *
+
+configuration = ConfigurationManager()
+
+bind = f"{SERVER_BIND}:{configuration.server_port}"
+
+worker_class = "gthread"
+workers = configuration.server_workers
+threads = configuration.server_threads
+
+loglevel = "debug" if configuration.is_debug else "info"
+
+if configuration.is_ssl:
+    certfile = configuration.ssl_certificate
+    keyfile = configuration.ssl_key
+
+
+def on_starting(server):
+    if configuration.is_shared_snapshot:
+        from webserver import start_sync_process
+
+        server.sync_process = start_sync_process()
+
+
+def on_exit(server):
+    sync_process = getattr(server, "sync_process", None)
+
+    if sync_process is not None:
+        sync_process.terminate()
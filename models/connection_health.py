@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+
+
+class ConnectionHealth:
+    connections: int
+    reconnects: int
+    connection_failures: int
+    heartbeat_failures: int
+    reloads: int
+    reload_failures: int
+    last_connected: Optional[datetime]
+    last_reload: Optional[datetime]
+    last_reload_duration: Optional[float]
+    last_heartbeat_duration: Optional[float]
+
+    def __init__(self):
+        self.connections = 0
+        self.reconnects = 0
+        self.connection_failures = 0
+        self.heartbeat_failures = 0
+        self.reloads = 0
+        self.reload_failures = 0
+        self.last_connected = None
+        self.last_reload = None
+        self.last_reload_duration = None
+        self.last_heartbeat_duration = None
+
+    def to_dict(self) -> dict:
+        data = dict(self.__dict__)
+
+        for key in ["last_connected", "last_reload"]:
+            value = data.get(key)
+
+            if value is not None:
+                data[key] = value.isoformat()
+
+        return data
+
+    def __repr__(self):
+        return f"{self.__dict__}"
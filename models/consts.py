@@ -1,15 +1,165 @@
 SERVER_PORT = 6123
 SERVER_BIND = "0.0.0.0"
 
+SERVER_MODE_DEVELOPMENT = "development"
+SERVER_MODE_PRODUCTION = "production"
+SERVER_MODES = [SERVER_MODE_DEVELOPMENT, SERVER_MODE_PRODUCTION]
+SERVER_WORKERS = 1
+SERVER_THREADS = 32
+
+EXTENSION_MANAGER = "ha_zwave_manager"
+EXTENSION_METRICS = "ha_zwave_metrics"
+EXTENSION_PROFILER = "ha_zwave_profiler"
+EXTENSION_TOPOLOGY_HISTORY = "ha_zwave_topology_history"
+EXTENSION_ANALYTICS = "ha_zwave_analytics"
+EXTENSION_STREAMS = "ha_zwave_streams"
+
+OZW_MAX_REQUESTS = 10
+OZW_REQUEST_TIMEOUT = 10
+OZW_STATUS_TTL = 300
+
+FETCH_STRATEGY_FULL = "full"
+FETCH_STRATEGY_ZWAVE = "zwave"
+FETCH_STRATEGIES = [FETCH_STRATEGY_FULL, FETCH_STRATEGY_ZWAVE]
+
 DOMAIN_ZWAVE = "zwave"
 DOMAIN_OZW = "ozw"
 SUPPORTED_DOMAINS = [DOMAIN_ZWAVE, DOMAIN_OZW]
+CONTROLLER_DOMAINS = [DOMAIN_OZW, DOMAIN_ZWAVE]
+
+GRAPH_WORKERS = 1
+GRAPH_HISTORY_SIZE = 50
 
 DEBUG_DIR = "/debug"
 LOG_FILE = f"{DEBUG_DIR}/ha-zwave-network.log"
 
+DEBUG_DUMP_MODE_OFF = "off"
+DEBUG_DUMP_MODE_CHANGED = "changed"
+DEBUG_DUMP_MODE_INTERVAL = "interval"
+DEBUG_DUMP_MODES = [DEBUG_DUMP_MODE_OFF, DEBUG_DUMP_MODE_CHANGED, DEBUG_DUMP_MODE_INTERVAL]
+DEBUG_DUMP_INTERVAL = 1
+
+DEBUG_DUMP_FORMAT_PRETTY = "pretty"
+DEBUG_DUMP_FORMAT_COMPACT = "compact"
+DEBUG_DUMP_FORMAT_GZIP = "gzip"
+DEBUG_DUMP_FORMATS = [DEBUG_DUMP_FORMAT_PRETTY, DEBUG_DUMP_FORMAT_COMPACT, DEBUG_DUMP_FORMAT_GZIP]
+
 WEBSITE_INDEX = "index.html"
 
+STREAM_KEEP_ALIVE_INTERVAL = 15
+STREAM_MAX_DURATION = 300
+STREAM_RETRY_DELAY = 1000
+
+METRIC_TYPE_COUNTER = "counter"
+METRIC_TYPE_GAUGE = "gauge"
+METRIC_TYPE_HISTOGRAM = "histogram"
+
+METRICS_DURATION_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+METRIC_STAGE_DURATION = "ha_zwave_stage_duration_seconds"
+METRIC_HTTP_REQUEST_DURATION = "ha_zwave_http_request_duration_seconds"
+METRIC_WS_RECEIVED_BYTES = "ha_zwave_ws_received_bytes_total"
+METRIC_WS_RECEIVED_MESSAGES = "ha_zwave_ws_received_messages_total"
+METRIC_WS_PAYLOAD_BYTES = "ha_zwave_ws_last_payload_bytes"
+METRIC_NODES_JSON_BYTES = "ha_zwave_nodes_json_bytes"
+METRIC_NODES = "ha_zwave_nodes"
+METRIC_EDGES = "ha_zwave_edges"
+METRIC_DEVICES = "ha_zwave_devices"
+METRIC_ENTITIES = "ha_zwave_entities"
+METRIC_TRACKED_ENTITIES = "ha_zwave_tracked_entities"
+METRIC_GENERATION = "ha_zwave_graph_generation"
+METRIC_CONNECTED = "ha_zwave_connected"
+METRIC_CONNECTIONS = "ha_zwave_connections_total"
+METRIC_CONNECTION_FAILURES = "ha_zwave_connection_failures_total"
+METRIC_HEARTBEAT_FAILURES = "ha_zwave_heartbeat_failures_total"
+METRIC_RELOADS = "ha_zwave_reloads_total"
+METRIC_RELOAD_FAILURES = "ha_zwave_reload_failures_total"
+
+METRICS = {
+    METRIC_STAGE_DURATION: (METRIC_TYPE_HISTOGRAM, "Duration of reload pipeline stages in seconds"),
+    METRIC_HTTP_REQUEST_DURATION: (METRIC_TYPE_HISTOGRAM, "Duration of HTTP requests in seconds"),
+    METRIC_WS_RECEIVED_BYTES: (METRIC_TYPE_COUNTER, "Bytes received from HA WebSocket by message type"),
+    METRIC_WS_RECEIVED_MESSAGES: (METRIC_TYPE_COUNTER, "Messages received from HA WebSocket by message type"),
+    METRIC_WS_PAYLOAD_BYTES: (METRIC_TYPE_GAUGE, "Size of the last HA WebSocket message in bytes by message type"),
+    METRIC_NODES_JSON_BYTES: (METRIC_TYPE_GAUGE, "Size of nodes.json in bytes"),
+    METRIC_NODES: (METRIC_TYPE_GAUGE, "Nodes in the graph"),
+    METRIC_EDGES: (METRIC_TYPE_GAUGE, "Edges in the graph"),
+    METRIC_DEVICES: (METRIC_TYPE_GAUGE, "Z-Wave devices loaded"),
+    METRIC_ENTITIES: (METRIC_TYPE_GAUGE, "Entities of Z-Wave devices loaded"),
+    METRIC_TRACKED_ENTITIES: (METRIC_TYPE_GAUGE, "Entities with tracked states"),
+    METRIC_GENERATION: (METRIC_TYPE_GAUGE, "Generation of the current graph"),
+    METRIC_CONNECTED: (METRIC_TYPE_GAUGE, "Whether the connection to HA is authorized"),
+    METRIC_CONNECTIONS: (METRIC_TYPE_COUNTER, "Connections to HA"),
+    METRIC_CONNECTION_FAILURES: (METRIC_TYPE_COUNTER, "Failed connections to HA"),
+    METRIC_HEARTBEAT_FAILURES: (METRIC_TYPE_COUNTER, "Failed heartbeats"),
+    METRIC_RELOADS: (METRIC_TYPE_COUNTER, "Successful reloads"),
+    METRIC_RELOAD_FAILURES: (METRIC_TYPE_COUNTER, "Failed reloads")
+}
+
+STAGE_RELOAD = "reload"
+STAGE_REGISTRIES = "registries"
+STAGE_STATES = "states"
+STAGE_OZW = "ozw"
+STAGE_LOAD_DEVICES = "load_devices"
+STAGE_UPDATE_NODES = "update_nodes"
+STAGE_SERIALIZE = "serialize"
+STAGE_DEBUG_DUMP = "debug_dump"
+
+PROFILE_TARGET_RELOAD = "reload"
+PROFILE_TARGET_NODES = "nodes"
+PROFILE_TARGETS = [PROFILE_TARGET_RELOAD, PROFILE_TARGET_NODES]
+PROFILING_COUNT = 1
+PROFILING_MAX_COUNT = 100
+PROFILING_TOP = 25
+PROFILING_STATS_LINES = 60
+PROFILING_FILES = 20
+
+SHARED_SNAPSHOT_PATH = "/dev/shm/ha-zwave-network.snapshot"
+SHARED_SNAPSHOT_POLL_INTERVAL = 0.5
+
+SNAPSHOT_CACHE_PATH = "ha-zwave-network.json.gz"
+SNAPSHOT_CACHE_VERSION = 1
+SNAPSHOT_CACHE_COMPRESS_LEVEL = 6
+
+TOPOLOGY_HISTORY_PATH = "ha-zwave-network.history.db"
+TOPOLOGY_HISTORY_VERSION = 1
+TOPOLOGY_HISTORY_RETENTION = 365
+TOPOLOGY_HISTORY_BUCKET_SIZE = 3600
+TOPOLOGY_HISTORY_FLUSH_INTERVAL = 10
+TOPOLOGY_HISTORY_BATCH_SIZE = 5000
+TOPOLOGY_HISTORY_CHECKPOINT_INTERVAL = 21600
+TOPOLOGY_HISTORY_SAMPLE_INTERVAL = 900
+TOPOLOGY_HISTORY_PURGE_INTERVAL = 86400
+TOPOLOGY_HISTORY_MAX_CHANGES = 10000
+TOPOLOGY_HISTORY_NODE_CHANGES_RANGE = 86400
+
+TOPOLOGY_CHANGE_NODE_ADDED = 1
+TOPOLOGY_CHANGE_NODE_REMOVED = 2
+TOPOLOGY_CHANGE_EDGE_ADDED = 3
+TOPOLOGY_CHANGE_EDGE_REMOVED = 4
+TOPOLOGY_CHANGE_HOP = 5
+TOPOLOGY_CHANGE_FAILED = 6
+TOPOLOGY_CHANGE_BATTERY = 7
+TOPOLOGY_CHANGE_RTT = 8
+
+TOPOLOGY_CHANGES = {
+    TOPOLOGY_CHANGE_NODE_ADDED: "node_added",
+    TOPOLOGY_CHANGE_NODE_REMOVED: "node_removed",
+    TOPOLOGY_CHANGE_EDGE_ADDED: "edge_added",
+    TOPOLOGY_CHANGE_EDGE_REMOVED: "edge_removed",
+    TOPOLOGY_CHANGE_HOP: "hop",
+    TOPOLOGY_CHANGE_FAILED: "failed",
+    TOPOLOGY_CHANGE_BATTERY: "battery",
+    TOPOLOGY_CHANGE_RTT: "rtt"
+}
+
+TOPOLOGY_NODE_ATTRIBUTES = {
+    TOPOLOGY_CHANGE_HOP: "hop",
+    TOPOLOGY_CHANGE_FAILED: "isFailed",
+    TOPOLOGY_CHANGE_BATTERY: "batteryLevel",
+    TOPOLOGY_CHANGE_RTT: "lastResponseRTT"
+}
+
 WEB_SOCKET_STATUS_DISCONNECTED = "disconnected"
 WEB_SOCKET_STATUS_CONNECTED = "connected"
 WEB_SOCKET_STATUS_AUTHORIZED = "authorized"
@@ -21,8 +171,44 @@ WEB_SOCKET_ERRORS = {
     "id_reuse": "A non-increasing identifier has been supplied"
 }
 
+WS_REQUEST_TIMEOUT = 60
+
+RELOAD_INTERVAL = 30
+NODES_UPDATE_DELAY = 0.5
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 120
+HEARTBEAT_INTERVAL = 15
+HEARTBEAT_TIMEOUT = 10
+
+WS_AUTH_REQUIRED = "auth_required"
+WS_AUTH_OK = "auth_ok"
+WS_AUTH_INVALID = "auth_invalid"
+WS_AUTH_RESULTS = [WS_AUTH_OK, WS_AUTH_INVALID]
+
+WS_STATES_DETAILS = "States"
+
 WS_MAIN_DETAILS = {
     "Devices": "config/device_registry/list",
     "Entities": "config/entity_registry/list",
-    "States": "get_states"
+    WS_STATES_DETAILS: "get_states"
 }
+
+EVENT_STATE_CHANGED = "state_changed"
+EVENT_DEVICE_REGISTRY_UPDATED = "device_registry_updated"
+EVENT_ENTITY_REGISTRY_UPDATED = "entity_registry_updated"
+
+WS_REGISTRY_EVENTS = [
+    EVENT_DEVICE_REGISTRY_UPDATED,
+    EVENT_ENTITY_REGISTRY_UPDATED
+]
+
+WS_EVENTS = [
+    EVENT_STATE_CHANGED,
+    EVENT_DEVICE_REGISTRY_UPDATED,
+    EVENT_ENTITY_REGISTRY_UPDATED
+]
+
+EDGE_TYPE_CHILD = "child"
+EDGE_TYPE_SIBLING = "sibling"
+EDGE_TYPE_PARENT = "parent"
+EDGE_TYPES = [EDGE_TYPE_CHILD, EDGE_TYPE_SIBLING, EDGE_TYPE_PARENT]
@@ -1,9 +1,33 @@
 from typing import Optional, List
 
-from models.node_relation import NodeRelation
-
 
 class Node:
+    __slots__ = [
+        "neighbors",
+        "isPrimary",
+        "isFailed",
+        "isAwake",
+        "isReady",
+        "isZWavePlus",
+        "isBeaming",
+        "isListening",
+        "isRouting",
+        "isSecure",
+        "product",
+        "manufacturer",
+        "queryStage",
+        "lastResponseRTT",
+        "batteryLevel",
+        "version",
+        "entityCount",
+        "id",
+        "instanceId",
+        "controller",
+        "name",
+        "hop",
+        "device"
+    ]
+
     id: Optional[int]
     name: Optional[str]
     hop: Optional[int]
@@ -17,7 +41,6 @@ class Node:
     isListening: Optional[bool]
     isRouting: Optional[bool]
     isSecure: Optional[bool]
-    edges: List[NodeRelation]
     product: Optional[str]
     manufacturer: Optional[str]
     queryStage: Optional[str]
@@ -25,6 +48,8 @@ class Node:
     batteryLevel: Optional[str]
     version: Optional[str]
     entityCount: Optional[int]
+    instanceId: Optional[int]
+    controller: Optional[str]
     device: dict
 
     def __init__(self, device: dict):
@@ -111,10 +136,28 @@ class Node:
                 self.version = attributes.get("application_version")
 
         self.id = node_id
+        self.instanceId = device.get("InstanceID")
+        self.controller = device.get("Controller")
         self.name = name
         self.hop = 0 if self.isPrimary else -1
         self.device = device
-        self.edges = []
+
+    def to_dict(self, include_device: bool = False) -> dict:
+        data = {key: getattr(self, key) for key in self.__slots__}
+
+        if not include_device:
+            del data["device"]
+
+        return data
+
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__ if key != "device"}
+
+    def __setstate__(self, state: dict):
+        self.device = None
+
+        for key, value in state.items():
+            setattr(self, key, value)
 
     def __repr__(self):
-        return f"{self.__dict__}"
+        return f"{self.to_dict(include_device=True)}"
@@ -0,0 +1,170 @@
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.consts import *
+from models.node import Node
+
+# Node IDs, hub ID, failed node IDs, edges reported by neighbors (synthetic edges to the hub are excluded)
+Topology = Tuple[Tuple[int, ...], Optional[int], Tuple[int, ...], Tuple[Tuple[int, int], ...]]
+
+
+class NodeGraph:
+    __slots__ = ["nodes", "offsets", "targets", "types", "controllers"]
+
+    nodes: Tuple[Node, ...]
+    offsets: array
+    targets: array
+    types: array
+    controllers: Dict[str, Tuple[int, int]]
+
+    def __init__(self):
+        self.nodes = ()
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        self.types = array("b")
+        self.controllers = {}
+
+    def get_edges(self, index: int) -> List[dict]:
+        node_id = self.nodes[index].id
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+
+        edges = []
+
+        for position in range(start, end):
+            edges.append({
+                "id": node_id,
+                "toNodeId": self.targets[position],
+                "type": EDGE_TYPES[self.types[position]]
+            })
+
+        return edges
+
+    def to_dict(self, index: int, include_device: bool = False) -> dict:
+        data = self.nodes[index].to_dict(include_device)
+        data["edges"] = self.get_edges(index)
+
+        return data
+
+    def to_list(self, include_device: bool = False) -> List[dict]:
+        return [self.to_dict(index, include_device) for index in range(len(self.nodes))]
+
+    def replace_node(self, index: int, node: Node):
+        nodes = list(self.nodes)
+        nodes[index] = node
+
+        graph = NodeGraph()
+        graph.nodes = tuple(nodes)
+        graph.offsets = self.offsets
+        graph.targets = self.targets
+        graph.types = self.types
+        graph.controllers = self.controllers
+
+        return graph
+
+    def get_controllers(self) -> List[dict]:
+        controllers = []
+
+        for controller, node_range in self.controllers.items():
+            start, end = node_range
+            domain, controller_id = controller.rsplit(".", 1)
+            hub_id = None
+
+            for node in self.nodes[start:end]:
+                if node.isPrimary:
+                    hub_id = node.id
+                    break
+
+            controllers.append({
+                "id": controller,
+                "domain": domain,
+                "controllerId": int(controller_id),
+                "hubId": hub_id,
+                "nodes": end - start,
+                "edges": self.offsets[end] - self.offsets[start]
+            })
+
+        return controllers
+
+    def get_controller_graph(self, controller: str):
+        start, end = self.controllers[controller]
+
+        if start == 0 and end == len(self.nodes):
+            return self
+
+        offset = self.offsets[start]
+
+        graph = NodeGraph()
+        graph.nodes = self.nodes[start:end]
+        graph.offsets = array("l", [position - offset for position in self.offsets[start:end + 1]])
+        graph.targets = self.targets[offset:self.offsets[end]]
+        graph.types = self.types[offset:self.offsets[end]]
+        graph.controllers = {controller: (0, end - start)}
+
+        return graph
+
+    def get_topology(self, controller: str) -> Topology:
+        start, end = self.controllers.get(controller, (0, 0))
+
+        node_ids = []
+        hub_id = None
+        failed_node_ids = set()
+        neighbors: Dict[int, Set[int]] = {}
+
+        for node in self.nodes[start:end]:
+            if node.id not in neighbors:
+                neighbors[node.id] = set()
+                node_ids.append(node.id)
+
+            if hub_id is None and node.isPrimary:
+                hub_id = node.id
+
+            if node.isFailed:
+                failed_node_ids.add(node.id)
+
+            neighbors[node.id].update(node.neighbors or [])
+
+        edges = set()
+
+        for index in range(start, end):
+            node_id = self.nodes[index].id
+
+            for position in range(self.offsets[index], self.offsets[index + 1]):
+                to_node_id = self.targets[position]
+
+                if to_node_id == node_id or to_node_id not in neighbors:
+                    continue
+
+                if to_node_id in neighbors[node_id] or node_id in neighbors[to_node_id]:
+                    edges.add((min(node_id, to_node_id), max(node_id, to_node_id)))
+
+        return tuple(node_ids), hub_id, tuple(sorted(failed_node_ids)), tuple(sorted(edges))
+
+    @staticmethod
+    def combine(graphs: Dict[str, "NodeGraph"]):
+        if len(graphs) == 1:
+            for controller, graph in graphs.items():
+                graph.controllers = {controller: (0, len(graph.nodes))}
+
+                return graph
+
+        graph = NodeGraph()
+        nodes = []
+
+        for controller, controller_graph in graphs.items():
+            start = len(nodes)
+            offset = len(graph.targets)
+
+            nodes.extend(controller_graph.nodes)
+
+            graph.offsets.extend([position + offset for position in controller_graph.offsets[1:]])
+            graph.targets.extend(controller_graph.targets)
+            graph.types.extend(controller_graph.types)
+            graph.controllers[controller] = (start, len(nodes))
+
+        graph.nodes = tuple(nodes)
+
+        return graph
+
+    def __repr__(self):
+        return f"{self.to_list()}"
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models.node import Node
+from models.node_graph import NodeGraph
+
+
+class NodesSnapshot:
+    generation: Optional[int]
+    graph: NodeGraph
+    nodes: Tuple[Node, ...]
+    nodes_map: Dict[Tuple[int, int, str], int]
+    controllers: List[dict]
+    controllers_content: Dict[str, bytes]
+    topologies_content: Dict[str, bytes]
+    content: Optional[bytes]
+    etag: Optional[str]
+    last_modified: Optional[datetime]
+    is_stale: bool
+
+    def __init__(self):
+        self.generation = None
+        self.graph = NodeGraph()
+        self.nodes = ()
+        self.nodes_map = {}
+        self.controllers = []
+        self.controllers_content = {}
+        self.topologies_content = {}
+        self.content = None
+        self.etag = None
+        self.last_modified = None
+        self.is_stale = False
+
+    def __repr__(self):
+        return f"{self.__dict__}"
@@ -1,6 +1,7 @@
 
 //Variables
 const REFRESH_INTERVAL = 5 * 1000;
+const SUBSCRIBE_RETRY_INTERVAL = 30 * 1000;
 
 let HOPS = {
     0: {
@@ -143,6 +144,12 @@ const options = {
 // Build graph
 let  networkItems = [];
 let networkView = null;
+let networkNodes = null;
+let networkEdges = null;
+let selectedNode = null;
+
+const controller = new URLSearchParams(window.location.search).get("controller");
+const controllerQuery = controller === null ? "" : `controller=${encodeURIComponent(controller)}`;
 
 const getCapabilities = (selectedItem) => {
     const capabilities = [];
@@ -244,8 +251,8 @@ const loadHopsLegend = () => {
     });
 };
 
-const loadNetworkView = () => {
-    const networkEdges = [];
+const getNetworkEdges = () => {
+    const edges = [];
 
     networkItems.filter(n => !n.isFailed)
                 .forEach(n => {
@@ -255,7 +262,8 @@ const loadNetworkView = () => {
 
                if (!toNode.isFailed) {
 
-                   networkEdges.push({
+                   edges.push({
+                       id: `${e.id}-${e.toNodeId}`,
                        from: e.id,
                        to: e.toNodeId,
                        width: 1,
@@ -266,15 +274,42 @@ const loadNetworkView = () => {
        });
     });
 
+    return edges;
+};
+
+const updateDataSet = (dataSet, items) => {
+    const itemIds = new Set(items.map(i => i.id));
+    const removedIds = dataSet.getIds().filter(id => !itemIds.has(id));
+
+    dataSet.remove(removedIds);
+    dataSet.update(items);
+};
+
+const loadNetworkView = () => {
+    const edges = getNetworkEdges();
+
+    if (networkView !== null) {
+        updateDataSet(networkNodes, networkItems);
+        updateDataSet(networkEdges, edges);
+
+        const currentItem = selectedNode === null ? undefined : getItem(selectedNode.id);
+
+        if (currentItem !== undefined) {
+            selectedItemChanged(currentItem);
+        }
+
+        return;
+    }
+
     // create an array with nodes
-    const nodes = new vis.DataSet(networkItems);
+    networkNodes = new vis.DataSet(networkItems);
 
     // create an array with edges
-    const edges = new vis.DataSet(networkEdges);
+    networkEdges = new vis.DataSet(edges);
 
     const data = {
-        nodes: nodes,
-        edges: edges
+        nodes: networkNodes,
+        edges: networkEdges
     };
 
     const container = document.getElementById("network");
@@ -429,9 +464,11 @@ const setCapabilityIcons = (selectedItem) => {
 const selectedItemChanged = (selectedItem) => {
     const sidebar = document.getElementById("sidebar");
 
-    const isSelected = selectedItem !== null;
+    const isSelected = selectedItem !== null && selectedItem !== undefined;
     sidebar.style.display = isSelected ? "block" : "none";
 
+    selectedNode = isSelected ? selectedItem : null;
+
     if (!isSelected) {
         return;
     }
@@ -475,7 +512,7 @@ const initialize = (nodes) => {
     nodes.forEach(n => {
         updateNodeData(n);
 
-        if(n.device.InstanceID == 1)
+        if(n.instanceId == 1 && n.controller === nodes[0].controller)
         {
             networkItems.push(n);
         }
@@ -489,15 +526,25 @@ const initialize = (nodes) => {
 const onLoad = () => {
     loadHopsLegend();
 
-    refresh();
+    if (window.EventSource === undefined) {
+        refresh();
+    }
+    else {
+        subscribe();
+    }
 }
 
 const onDebug = () => {
-    window.open('/data/nodes.json')
+    if (selectedNode === null) {
+        window.open(`/data/nodes.json?${controllerQuery}`);
+    }
+    else {
+        window.open(`/data/nodes/${selectedNode.id}.json?instance=${selectedNode.instanceId}&controller=${encodeURIComponent(selectedNode.controller)}`);
+    }
 }
 
 const refresh = () => {
-    fetch("data/nodes.json")
+    fetch(`data/nodes.json?${controllerQuery}`)
         .then(response => {
             if (!response.ok) throw new Error(response.status);
             return response.json();
@@ -507,4 +554,24 @@ const refresh = () => {
 
         return nodes;
     }).catch(e => console.log(e));
+};
+
+const subscribe = () => {
+    const eventSource = new EventSource(`data/nodes/stream?${controllerQuery}`);
+
+    eventSource.addEventListener("nodes", e => {
+        const nodes = JSON.parse(e.data);
+
+        initialize(nodes);
+    });
+
+    eventSource.onerror = e => {
+        console.log(e);
+
+        if (eventSource.readyState === EventSource.CLOSED) {
+            refresh();
+
+            setTimeout(subscribe, SUBSCRIBE_RETRY_INTERVAL);
+        }
+    };
 };
\ No newline at end of file
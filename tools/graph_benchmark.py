@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from mesh_generator import DOMAIN_OZW, DOMAIN_ZWAVE, generate_mesh
+
+from Managers.configuration_manager import ConfigurationManager
+from Managers.data_manager import HAZWaveManager
+
+STAGE_LOAD_DEVICES = "load_devices"
+STAGE_UPDATE_NODES = "update_nodes"
+STAGE_NODES = "  nodes"
+STAGE_EDGES = "  edges"
+STAGE_HOPS = "  hops"
+STAGE_RELATIONS = "  relations"
+STAGE_SNAPSHOT = "  snapshot"
+
+STAGES = [STAGE_LOAD_DEVICES, STAGE_UPDATE_NODES, STAGE_NODES, STAGE_EDGES, STAGE_HOPS, STAGE_RELATIONS, STAGE_SNAPSHOT]
+
+
+class StageRecorder:
+    durations: Dict[str, float]
+    retained: Dict[str, int]
+    peaks: Dict[str, int]
+
+    def __init__(self, is_tracing: bool):
+        self.is_tracing = is_tracing
+        self.durations = {}
+        self.retained = {}
+        self.peaks = {}
+
+    def _start(self) -> tuple:
+        current = 0
+
+        if self.is_tracing:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        return time.perf_counter(), current
+
+    def _stop(self, name: str, started: tuple):
+        duration = time.perf_counter() - started[0]
+
+        self.durations[name] = self.durations.get(name, 0) + duration
+
+        if self.is_tracing:
+            current, peak = tracemalloc.get_traced_memory()
+
+            self.retained[name] = self.retained.get(name, 0) + current - started[1]
+            self.peaks[name] = max(self.peaks.get(name, 0), peak - started[1])
+
+    def wrap(self, name: str, function):
+        def wrapper(*args, **kwargs):
+            started = self._start()
+
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                self._stop(name, started)
+
+        return wrapper
+
+    def wrap_async(self, name: str, function):
+        async def wrapper(*args, **kwargs):
+            started = self._start()
+
+            try:
+                return await function(*args, **kwargs)
+
+            finally:
+                self._stop(name, started)
+
+        return wrapper
+
+
+def get_manager(recorder: StageRecorder) -> HAZWaveManager:
+    manager = HAZWaveManager(ConfigurationManager())
+
+    manager.load_devices = recorder.wrap_async(STAGE_LOAD_DEVICES, manager.load_devices)
+    graph_builder = manager._graph_builder
+
+    graph_builder._update_edges = recorder.wrap(STAGE_EDGES, graph_builder._update_edges)
+    graph_builder._update_hops = recorder.wrap(STAGE_HOPS, graph_builder._update_hops)
+    graph_builder._get_relation_types = recorder.wrap(STAGE_RELATIONS, graph_builder._get_relation_types)
+    manager._set_nodes = recorder.wrap(STAGE_SNAPSHOT, manager._set_nodes)
+
+    update_nodes = manager._update_nodes
+
+    def update_nodes_wrapper():
+        started = time.perf_counter()
+
+        update_nodes()
+
+        recorder.durations[STAGE_UPDATE_NODES] = time.perf_counter() - started
+
+    manager._update_nodes = update_nodes_wrapper
+
+    return manager
+
+
+def run_round(data: Dict[str, list],
+              is_tracing: bool,
+              executor: Optional[ProcessPoolExecutor]) -> Tuple[StageRecorder, Optional[ProcessPoolExecutor]]:
+    recorder = StageRecorder(is_tracing)
+    manager = get_manager(recorder)
+    manager._graph_builder._executor = executor
+
+    round_data = copy.deepcopy(data)
+    ozw_statuses = {(item.get("ozw_instance", 1), item.get("node_id")): item
+                    for item in round_data.get("OZWStatus", [])}
+
+    if is_tracing:
+        tracemalloc.start()
+
+    asyncio.run(manager.load_devices(round_data))
+
+    for device in manager._devices:
+        ozw_key = (device.get("ControllerID"), device.get("NodeID"))
+
+        if ozw_key in ozw_statuses:
+            device["OZWStatus"] = ozw_statuses.get(ozw_key)
+
+    manager._update_nodes()
+
+    if is_tracing:
+        tracemalloc.stop()
+
+    nested_duration = sum([recorder.durations.get(stage, 0) for stage in [STAGE_EDGES,
+                                                                          STAGE_HOPS,
+                                                                          STAGE_RELATIONS,
+                                                                          STAGE_SNAPSHOT]])
+
+    recorder.durations[STAGE_NODES] = recorder.durations.get(STAGE_UPDATE_NODES, 0) - nested_duration
+
+    return recorder, manager._graph_builder._executor
+
+
+def run(args):
+    os.environ.setdefault("HA_URL", "http://127.0.0.1:8123")
+    os.environ.setdefault("HA_TOKEN", "benchmark")
+    os.environ["DEBUG_DUMP"] = "off"
+
+    logging.basicConfig(level=logging.ERROR)
+
+    domains = [DOMAIN_ZWAVE, DOMAIN_OZW] if args.domain == "all" else [args.domain]
+
+    if args.controllers > 1:
+        domains = [DOMAIN_OZW]
+
+    print(f"Neighbors: {args.neighbors}, failed: {args.failed_ratio}, "
+          f"missing neighbors: {args.missing_neighbors_ratio}, rounds: {args.rounds}")
+
+    for domain in domains:
+        for nodes in [int(size) for size in args.sizes.split(",")]:
+            data = generate_mesh(nodes,
+                                 args.neighbors,
+                                 domain,
+                                 args.entities_per_node,
+                                 0,
+                                 args.seed,
+                                 args.failed_ratio,
+                                 args.missing_neighbors_ratio,
+                                 args.controllers)
+
+            durations: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+
+            _, executor = run_round(data, False, None)
+
+            for _ in range(args.rounds):
+                recorder, executor = run_round(data, False, executor)
+
+                for stage in STAGES:
+                    durations[stage].append(recorder.durations.get(stage, 0))
+
+            allocations, executor = run_round(data, True, executor)
+
+            if executor is not None:
+                executor.shutdown()
+
+            print()
+            print(f"{domain.upper()}, {args.controllers} x {nodes} nodes")
+            print(f"{'Stage':<14} {'Mean':>10} {'p50':>10} {'Min':>10} {'Retained':>11} {'Peak':>11}")
+
+            for stage in STAGES:
+                stage_durations = durations[stage]
+
+                retained = allocations.retained.get(stage)
+                peak = allocations.peaks.get(stage)
+
+                print(f"{stage:<14} "
+                      f"{statistics.mean(stage_durations) * 1000:>8.2f}ms "
+                      f"{statistics.median(stage_durations) * 1000:>8.2f}ms "
+                      f"{min(stage_durations) * 1000:>8.2f}ms "
+                      f"{'-' if retained is None else f'{retained / 1024:.0f}KiB':>11} "
+                      f"{'-' if peak is None else f'{peak / 1024:.0f}KiB':>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph builder benchmark over synthetic Z-Wave meshes")
+    parser.add_argument("--sizes", default="25,50,100,232", help="Comma separated node counts")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed rounds per size")
+    parser.add_argument("--domain", default="all", choices=["all", DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--neighbors", type=int, default=4, help="Nearest nodes linked to each node")
+    parser.add_argument("--entities-per-node", type=int, default=3)
+    parser.add_argument("--failed-ratio", type=float, default=0.05, help="Part of nodes marked as failed")
+    parser.add_argument("--missing-neighbors-ratio", type=float, default=0.05, help="Part of nodes without neighbors")
+    parser.add_argument("--controllers", type=int, default=1, help="OZW instances, each with its own mesh")
+    parser.add_argument("--seed", type=int, default=1)
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
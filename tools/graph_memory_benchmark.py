@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import copy
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+from array import array
+from typing import Dict, List, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from mesh_generator import DOMAIN_OZW, DOMAIN_ZWAVE, generate_mesh
+
+from Managers.configuration_manager import ConfigurationManager
+from Managers.data_manager import HAZWaveManager
+from models.consts import EDGE_TYPES
+from models.node import Node
+from models.node_graph import NodeGraph
+
+
+class LegacyNodeRelation:
+    def __init__(self, node_id: int, to_node_id: int, edge_type: str):
+        self.id = node_id
+        self.toNodeId = to_node_id
+        self.type = edge_type
+
+
+class LegacyNode:
+    def __init__(self, node: Node):
+        for key in Node.__slots__:
+            if key != "controller":
+                setattr(self, key, getattr(node, key))
+
+        self.edges = []
+
+
+def build_legacy(graph: NodeGraph) -> List[LegacyNode]:
+    nodes = []
+
+    for index in range(len(graph.nodes)):
+        node = LegacyNode(graph.nodes[index])
+
+        for position in range(graph.offsets[index], graph.offsets[index + 1]):
+            node.edges.append(LegacyNodeRelation(node.id, graph.targets[position], EDGE_TYPES[graph.types[position]]))
+
+        nodes.append(node)
+
+    return nodes
+
+
+def build_graph(graph: NodeGraph) -> NodeGraph:
+    nodes = []
+
+    for graph_node in graph.nodes:
+        node = Node.__new__(Node)
+
+        for key in Node.__slots__:
+            setattr(node, key, getattr(graph_node, key))
+
+        nodes.append(node)
+
+    built_graph = NodeGraph()
+
+    for key in NodeGraph.__slots__:
+        value = getattr(graph, key)
+
+        if isinstance(value, array):
+            value = array(value.typecode, value)
+
+        elif isinstance(value, dict):
+            value = dict(value)
+
+        setattr(built_graph, key, value)
+
+    built_graph.nodes = tuple(nodes)
+
+    return built_graph
+
+
+def load(manager: HAZWaveManager, data: Dict[str, list]):
+    data = copy.deepcopy(data)
+    ozw_statuses = {(item.get("ozw_instance", 1), item.get("node_id")): item for item in data.get("OZWStatus", [])}
+
+    asyncio.run(manager.load_devices(data))
+
+    for device in manager._devices:
+        ozw_key = (device.get("ControllerID"), device.get("NodeID"))
+
+        if ozw_key in ozw_statuses:
+            device["OZWStatus"] = ozw_statuses.get(ozw_key)
+
+    manager._update_nodes()
+
+
+def measure(builder, graphs: List[NodeGraph], reloads: int) -> Tuple[int, int]:
+    retained = 0
+    peak = 0
+
+    tracemalloc.start()
+
+    for reload in range(reloads):
+        current = None
+        gc.collect()
+
+        started = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        current = builder(graphs[reload % len(graphs)])
+
+        traced, traced_peak = tracemalloc.get_traced_memory()
+
+        retained = max(retained, traced - started)
+        peak = max(peak, traced_peak - started)
+
+    tracemalloc.stop()
+
+    return retained, peak
+
+
+def run(args):
+    os.environ.setdefault("HA_URL", "http://127.0.0.1:8123")
+    os.environ.setdefault("HA_TOKEN", "benchmark")
+    os.environ["DEBUG_DUMP"] = "off"
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"Nodes: {args.nodes}, neighbors: {args.neighbors}, variants: {args.variants}, reloads: {args.reloads}")
+
+    for domain in [DOMAIN_ZWAVE, DOMAIN_OZW] if args.domain == "all" else [args.domain]:
+        variants = [generate_mesh(args.nodes, args.neighbors, domain, 3, 0, args.seed + index, 0.05, 0.05)
+                    for index in range(args.variants)]
+
+        graphs = []
+
+        for data in variants:
+            manager = HAZWaveManager(ConfigurationManager())
+
+            load(manager, data)
+
+            graphs.append(manager.get_nodes_snapshot().graph)
+
+        manager = HAZWaveManager(ConfigurationManager())
+        manager_retained = []
+
+        tracemalloc.start()
+
+        for reload in range(args.reloads):
+            load(manager, variants[reload % len(variants)])
+            gc.collect()
+
+            manager_retained.append(tracemalloc.get_traced_memory()[0])
+
+        tracemalloc.stop()
+
+        edges = sum([len(graph.targets) for graph in graphs]) // len(graphs)
+
+        legacy_retained, legacy_peak = measure(build_legacy, graphs, args.reloads)
+        graph_retained, graph_peak = measure(build_graph, graphs, args.reloads)
+
+        print()
+        print(f"{domain.upper()}, {len(graphs[0].nodes)} nodes, {edges} edges on average")
+        print(f"{'Graph':<26} {'Retained':>11} {'Peak':>11} {'Per edge':>10}")
+        print(f"{'Node / NodeRelation':<26} {legacy_retained / 1024:>8.0f}KiB {legacy_peak / 1024:>8.0f}KiB "
+              f"{legacy_retained / edges:>9.0f}B")
+        print(f"{'Slotted Node / CSR arrays':<26} {graph_retained / 1024:>8.0f}KiB {graph_peak / 1024:>8.0f}KiB "
+              f"{graph_retained / edges:>9.0f}B")
+        print(f"Manager retained after reload 1: {manager_retained[0] / 1024:.0f}KiB, "
+              f"after reload {args.reloads}: {manager_retained[-1] / 1024:.0f}KiB, "
+              f"max: {max(manager_retained) / 1024:.0f}KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node graph memory, per-edge objects vs CSR arrays, over many reloads")
+    parser.add_argument("--nodes", type=int, default=232, help="Number of Z-Wave nodes, including the controller")
+    parser.add_argument("--neighbors", type=int, default=30, help="Nearest nodes linked to each node")
+    parser.add_argument("--variants", type=int, default=4, help="Meshes the reloads cycle through")
+    parser.add_argument("--reloads", type=int, default=50)
+    parser.add_argument("--domain", default=DOMAIN_OZW, choices=["all", DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--seed", type=int, default=1)
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
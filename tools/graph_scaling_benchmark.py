@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import statistics
+import sys
+
+from typing import Dict, List, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from graph_benchmark import STAGE_UPDATE_NODES, StageRecorder, get_manager
+from mesh_generator import DOMAIN_OZW, generate_mesh
+
+from Managers.data_manager import HAZWaveManager
+
+
+def get_cases(cases: str) -> List[Tuple[int, int]]:
+    items = []
+
+    for case in cases.split(","):
+        controllers, nodes = case.lower().split("x")
+
+        items.append((int(controllers), int(nodes)))
+
+    return items
+
+
+def run_round(data: Dict[str, list]) -> Tuple[float, HAZWaveManager]:
+    recorder = StageRecorder(False)
+    manager = get_manager(recorder)
+
+    round_data = copy.deepcopy(data)
+    ozw_statuses = {(item.get("ozw_instance", 1), item.get("node_id")): item
+                    for item in round_data.get("OZWStatus", [])}
+
+    asyncio.run(manager.load_devices(round_data))
+
+    for device in manager._devices:
+        ozw_key = (device.get("ControllerID"), device.get("NodeID"))
+
+        if ozw_key in ozw_statuses:
+            device["OZWStatus"] = ozw_statuses.get(ozw_key)
+
+    manager._update_nodes()
+    manager._graph_builder._shutdown()
+
+    return recorder.durations.get(STAGE_UPDATE_NODES, 0), manager
+
+
+def run(args):
+    os.environ.setdefault("HA_URL", "http://127.0.0.1:8123")
+    os.environ.setdefault("HA_TOKEN", "benchmark")
+    os.environ["DEBUG_DUMP"] = "off"
+    os.environ["GRAPH_WORKERS"] = str(args.workers)
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"Neighbors: {args.neighbors}, failed: {args.failed_ratio}, "
+          f"missing neighbors: {args.missing_neighbors_ratio}, workers: {args.workers}, rounds: {args.rounds}")
+    print(f"{'Mesh':<10} {'Nodes':>7} {'Edges':>8} {'p50':>11} {'Min':>11} {'Per node':>10} {'Per edge':>10}")
+
+    edge_durations = []
+
+    for controllers, nodes in get_cases(args.cases):
+        data = generate_mesh(nodes,
+                             args.neighbors,
+                             DOMAIN_OZW,
+                             args.entities_per_node,
+                             0,
+                             args.seed,
+                             args.failed_ratio,
+                             args.missing_neighbors_ratio,
+                             controllers)
+
+        _, manager = run_round(data)
+
+        graph = manager.get_nodes_snapshot().graph
+        durations = [run_round(data)[0] for _ in range(args.rounds)]
+        duration = statistics.median(durations)
+
+        edge_durations.append(duration / max(len(graph.targets), 1))
+
+        print(f"{f'{controllers} x {nodes}':<10} "
+              f"{len(graph.nodes):>7} "
+              f"{len(graph.targets):>8} "
+              f"{duration * 1000:>9.2f}ms "
+              f"{min(durations) * 1000:>9.2f}ms "
+              f"{duration / max(len(graph.nodes), 1) * 1000000:>8.1f}us "
+              f"{edge_durations[-1] * 1000000:>8.1f}us")
+
+    print(f"Per edge, largest / smallest: {max(edge_durations) / min(edge_durations):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph builder scaling over single and multi-controller OZW meshes")
+    parser.add_argument("--cases", default="1x50,1x232,4x232,10x232,20x232",
+                        help="Comma separated meshes as {controllers}x{nodes per controller}")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per mesh")
+    parser.add_argument("--neighbors", type=int, default=8, help="Nearest nodes linked to each node")
+    parser.add_argument("--entities-per-node", type=int, default=1)
+    parser.add_argument("--failed-ratio", type=float, default=0.05, help="Part of nodes marked as failed")
+    parser.add_argument("--missing-neighbors-ratio", type=float, default=0.05, help="Part of nodes without neighbors")
+    parser.add_argument("--workers", type=int, default=1, help="GRAPH_WORKERS, 1 builds the graphs serially")
+    parser.add_argument("--seed", type=int, default=1)
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
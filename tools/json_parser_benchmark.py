@@ -0,0 +1,190 @@
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from typing import Dict, List, Set, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from mesh_generator import DOMAIN_OZW, DOMAIN_ZWAVE, generate_mesh
+
+from Managers.json_parser import JsonParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+METHOD_JSON = "json.loads + filter"
+METHOD_ORJSON = "orjson.loads + filter"
+METHOD_FILTERED = "JsonParser filtered"
+
+METHODS = [METHOD_JSON, METHOD_ORJSON, METHOD_FILTERED]
+
+
+def get_frame(args) -> Tuple[str, Set[str]]:
+    data = generate_mesh(args.nodes, 4, args.domain, args.entities_per_node, args.other_entities, args.seed)
+
+    device_ids = {device.get("id") for device in data.get("Devices", [])}
+    entity_ids = {entity.get("entity_id") for entity in data.get("Entities", []) if entity.get("device_id") in device_ids}
+
+    states = data.get("States", [])
+    padding = max(int(args.size * 1024 * 1024 / len(states)) - 400, 0)
+
+    for state in states:
+        state["attributes"]["description"] = "x" * padding
+
+    frame = json.dumps({"id": 4, "type": "result", "success": True, "result": states})
+
+    return frame, entity_ids
+
+
+def filter_states(data: dict, entity_ids: Set[str]) -> List[dict]:
+    return [state for state in data.get("result") if state.get("entity_id") in entity_ids]
+
+
+def get_memory_status(key: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{key}:"):
+                return int(line.split()[1])
+
+    return 0
+
+
+def reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+        return True
+
+    except OSError:
+        return False
+
+
+def parse_states(method: str, frame: str, entity_ids: Set[str]) -> List[dict]:
+    if method == METHOD_JSON:
+        return filter_states(json.loads(frame), entity_ids)
+
+    if method == METHOD_ORJSON:
+        return filter_states(orjson.loads(frame), entity_ids)
+
+    return JsonParser().loads_filtered_result(frame, "entity_id", entity_ids).get("result")
+
+
+def parse(method: str, frame_path: str, entity_ids_path: str):
+    with open(frame_path) as f:
+        frame = f.read()
+
+    with open(entity_ids_path) as f:
+        entity_ids = set(json.load(f))
+
+    gc.collect()
+
+    rss = get_memory_status("VmRSS")
+    is_peak_reset = reset_peak_rss()
+
+    started = time.perf_counter()
+    states = parse_states(method, frame, entity_ids)
+    duration = time.perf_counter() - started
+
+    peak_rss = get_memory_status("VmHWM") - rss if is_peak_reset else None
+
+    kept = len(states)
+    states = None
+    gc.collect()
+
+    tracemalloc.start()
+
+    parse_states(method, frame, entity_ids)
+
+    peak = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.stop()
+
+    print(json.dumps({
+        "duration": duration,
+        "rss": peak_rss,
+        "peak": peak,
+        "kept": kept
+    }))
+
+
+def run(args):
+    frame, entity_ids = get_frame(args)
+
+    work_dir = tempfile.mkdtemp()
+    frame_path = f"{work_dir}/states.json"
+    entity_ids_path = f"{work_dir}/entity_ids.json"
+
+    with open(frame_path, "w") as f:
+        f.write(frame)
+
+    with open(entity_ids_path, "w") as f:
+        json.dump(sorted(entity_ids), f)
+
+    print(f"Frame: {len(frame) / 1024 / 1024:.1f} MiB, {frame.count('entity_id')} states, "
+          f"{len(entity_ids)} linked entities, rounds: {args.rounds}")
+    print(f"The frame is held whole while it is parsed, memory below is on top of it")
+    print(f"{'Method':<22} {'p50':>10} {'Min':>10} {'Peak RSS':>11} {'Peak alloc':>11} {'Kept':>6}")
+
+    for method in METHODS:
+        if method == METHOD_ORJSON and orjson is None:
+            continue
+
+        results: List[Dict[str, float]] = []
+
+        for _ in range(args.rounds):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__),
+                                     "--method", method,
+                                     "--frame", frame_path,
+                                     "--entity-ids", entity_ids_path],
+                                    check=True, capture_output=True, text=True).stdout
+
+            results.append(json.loads(output))
+
+        durations = sorted([result.get("duration") for result in results])
+        peak_rss = [result.get("rss") for result in results if result.get("rss") is not None]
+        peak = max([result.get("peak") for result in results])
+
+        print(f"{method:<22} "
+              f"{durations[len(durations) // 2] * 1000:>8.0f}ms "
+              f"{durations[0] * 1000:>8.0f}ms "
+              f"{'-' if len(peak_rss) == 0 else f'{max(peak_rss) / 1024:.1f}MiB':>11} "
+              f"{peak / 1024 / 1024:>8.1f}MiB "
+              f"{results[0].get('kept'):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="get_states parse time and RSS, full decode vs filtered decode")
+    parser.add_argument("--size", type=float, default=20, help="Approximate frame size in MiB")
+    parser.add_argument("--nodes", type=int, default=200, help="Number of Z-Wave nodes, including the controller")
+    parser.add_argument("--entities-per-node", type=int, default=3)
+    parser.add_argument("--other-entities", type=int, default=12000, help="States not linked to Z-Wave")
+    parser.add_argument("--domain", default=DOMAIN_ZWAVE, choices=[DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--rounds", type=int, default=3, help="Parses per method, each in a new process")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--method", choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument("--frame", help=argparse.SUPPRESS)
+    parser.add_argument("--entity-ids", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.method is not None:
+        parse(args.method, args.frame, args.entity_ids)
+
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
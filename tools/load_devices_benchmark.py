@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import statistics
+import sys
+import time
+
+from typing import Dict, List, Optional
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from mesh_generator import DOMAIN_OZW, DOMAIN_ZWAVE, generate_mesh
+
+from Managers.configuration_manager import ConfigurationManager
+from Managers.data_manager import HAZWaveManager
+
+
+def join_nested(data: Dict[str, list]) -> Dict[str, dict]:
+    devices = data.get("Devices", [])
+    entities = data.get("Entities", [])
+    states = data.get("States", [])
+
+    for device in devices:
+        device_id = device.get("id")
+
+        for entity in entities:
+            entity_device_id = entity.get("device_id")
+
+            if device_id == entity_device_id:
+                entity_id = entity.get("entity_id")
+
+                for state in states:
+                    state_entity_id = state.get("entity_id")
+
+                    if state_entity_id == entity_id:
+                        entity["State"] = state
+
+                        if f"{DOMAIN_ZWAVE}." in state_entity_id:
+                            device["ZWaveStatus"] = state
+
+                if "Entities" not in device:
+                    device["Entities"] = []
+
+                device["Entities"].append(entity)
+
+    return {device.get("id"): device for device in devices}
+
+
+def load_devices(manager: HAZWaveManager, data: Dict[str, list]) -> float:
+    started = time.perf_counter()
+
+    asyncio.run(manager.load_devices(data))
+
+    return time.perf_counter() - started
+
+
+def get_differences(manager: HAZWaveManager, nested_devices: Dict[str, dict]) -> int:
+    differences = 0
+
+    for device in manager._devices:
+        nested_device = nested_devices.get(device.get("id"))
+
+        for key in ["Entities", "ZWaveStatus"]:
+            if device.get(key) != nested_device.get(key):
+                differences += 1
+
+    return differences
+
+
+def run(args):
+    os.environ.setdefault("HA_URL", "http://127.0.0.1:8123")
+    os.environ.setdefault("HA_TOKEN", "benchmark")
+    os.environ["DEBUG_DUMP"] = "off"
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"{args.nodes} nodes, {args.entities_per_node} entities per node, rounds: {args.rounds}")
+    print(f"{'Domain':<7} {'Entities':>9} {'Mean':>10} {'p50':>10} {'Min':>10} {'Nested':>10} {'Differences':>12}")
+
+    for domain in [DOMAIN_ZWAVE, DOMAIN_OZW] if args.domain == "all" else [args.domain]:
+        for other_entities in [int(size) for size in args.other_entities.split(",")]:
+            data = generate_mesh(args.nodes, args.neighbors, domain, args.entities_per_node, other_entities, args.seed)
+
+            durations: List[float] = []
+
+            for _ in range(args.rounds):
+                manager = HAZWaveManager(ConfigurationManager())
+
+                durations.append(load_devices(manager, copy.deepcopy(data)))
+
+            nested_duration: Optional[float] = None
+            differences: Optional[int] = None
+
+            if len(data.get("Entities")) <= args.nested_limit:
+                nested_data = copy.deepcopy(data)
+
+                started = time.perf_counter()
+                nested_devices = join_nested(nested_data)
+                nested_duration = time.perf_counter() - started
+
+                differences = get_differences(manager, nested_devices)
+
+            print(f"{domain.upper():<7} "
+                  f"{len(data.get('Entities')):>9} "
+                  f"{statistics.mean(durations) * 1000:>8.2f}ms "
+                  f"{statistics.median(durations) * 1000:>8.2f}ms "
+                  f"{min(durations) * 1000:>8.2f}ms "
+                  f"{'-' if nested_duration is None else f'{nested_duration * 1000:.0f}ms':>10} "
+                  f"{'-' if differences is None else differences:>12}")
+
+            if differences is not None and differences > 0:
+                sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="load_devices benchmark over synthetic registries")
+    parser.add_argument("--nodes", type=int, default=300, help="Number of Z-Wave nodes, including the controller")
+    parser.add_argument("--neighbors", type=int, default=4)
+    parser.add_argument("--entities-per-node", type=int, default=3)
+    parser.add_argument("--other-entities", default="0,1000,5000,10000,50000",
+                        help="Comma separated counts of entities not linked to Z-Wave")
+    parser.add_argument("--rounds", type=int, default=10, help="Timed rounds per size")
+    parser.add_argument("--domain", default="all", choices=["all", DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--nested-limit", type=int, default=12000,
+                        help="Largest entity count to time the devices x entities x states join against")
+    parser.add_argument("--seed", type=int, default=1)
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import ssl
+import time
+import urllib.error
+import urllib.request
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+
+def send_request(url: str, etag: Optional[str], ssl_context) -> (float, int, int):
+    headers = {}
+
+    if etag is not None:
+        headers["If-None-Match"] = etag
+
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+
+    try:
+        with urllib.request.urlopen(request, context=ssl_context) as response:
+            content = response.read()
+            status = response.status
+
+    except urllib.error.HTTPError as ex:
+        content = b""
+        status = ex.code
+
+    except Exception:
+        content = b""
+        status = 0
+
+    return time.perf_counter() - started, status, len(content)
+
+
+def get_percentile(durations, percentile: float) -> float:
+    index = min(int(len(durations) * percentile / 100), len(durations) - 1)
+
+    return durations[index]
+
+
+def run(url: str, requests: int, concurrency: int, is_conditional: bool):
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+
+    etag = None
+
+    if is_conditional:
+        with urllib.request.urlopen(url, context=ssl_context) as response:
+            etag = response.headers.get("ETag")
+
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda i: send_request(url, etag, ssl_context), range(requests)))
+
+    duration = time.perf_counter() - started
+
+    durations = sorted([result[0] for result in results])
+    statuses = {}
+
+    for result in results:
+        statuses[result[1]] = statuses.get(result[1], 0) + 1
+
+    total_bytes = sum([result[2] for result in results])
+
+    print(f"URL:            {url}")
+    print(f"Requests:       {requests} (concurrency: {concurrency}, conditional: {is_conditional})")
+    print(f"Duration:       {duration:.2f}s")
+    print(f"Requests / sec: {requests / duration:.1f}")
+    print(f"Latency p50:    {get_percentile(durations, 50) * 1000:.1f}ms")
+    print(f"Latency p99:    {get_percentile(durations, 99) * 1000:.1f}ms")
+    print(f"Latency max:    {durations[-1] * 1000:.1f}ms")
+    print(f"Bytes received: {total_bytes}")
+    print(f"Statuses:       {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for Z-Wave Network Viewer endpoints")
+    parser.add_argument("--url", default="http://127.0.0.1:6123/data/nodes.json")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--conditional", action="store_true", help="Send If-None-Match with the current ETag")
+
+    arguments = parser.parse_args()
+
+    run(arguments.url, arguments.requests, arguments.concurrency, arguments.conditional)
+
+
+if __name__ == "__main__":
+    main()
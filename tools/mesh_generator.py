@@ -0,0 +1,295 @@
+import argparse
+import json
+import math
+import os
+import random
+import uuid
+
+from typing import Dict, List, Optional, Tuple
+
+DOMAIN_ZWAVE = "zwave"
+DOMAIN_OZW = "ozw"
+
+MANUFACTURERS = [
+    ("Aeotec", ["ZW090 Z-Stick Gen5", "ZW100 MultiSensor 6", "ZW096 Smart Switch 6", "ZW111 Nano Dimmer"]),
+    ("Fibargroup", ["FGS223 Double Relay", "FGD212 Dimmer 2", "FGMS001 Motion Sensor", "FGWPE Wall Plug"]),
+    ("Zooz", ["ZEN26 On Off Switch", "ZSE40 4-in-1 Sensor", "ZEN30 Double Switch"]),
+    ("Qubino", ["ZMNHDD1 Flush Dimmer", "ZMNHAD1 Flush 1 Relay"])
+]
+
+
+def get_positions(random_generator: random.Random, nodes: int) -> List[Tuple[float, float]]:
+    positions = [(0.5, 0.5)]
+
+    for _ in range(1, nodes):
+        positions.append((random_generator.random(), random_generator.random()))
+
+    return positions
+
+
+def get_neighbors(positions: List[Tuple[float, float]], neighbors: int) -> List[List[int]]:
+    nodes = len(positions)
+    neighbor_sets = [set() for _ in range(nodes)]
+
+    for index in range(nodes):
+        x, y = positions[index]
+
+        distances = []
+
+        for other_index in range(nodes):
+            if other_index != index:
+                other_x, other_y = positions[other_index]
+
+                distances.append((math.hypot(x - other_x, y - other_y), other_index))
+
+        distances.sort()
+
+        for _, other_index in distances[:neighbors]:
+            neighbor_sets[index].add(other_index)
+            neighbor_sets[other_index].add(index)
+
+    return [sorted([neighbor + 1 for neighbor in neighbor_set]) for neighbor_set in neighbor_sets]
+
+
+def get_device(random_generator: random.Random,
+               domain: str,
+               node_id: int,
+               is_controller: bool,
+               controller_id: int = 1) -> dict:
+    manufacturer, products = random_generator.choice(MANUFACTURERS)
+    product = products[0] if is_controller else random_generator.choice(products[1:])
+
+    external_id = f"{controller_id}.{node_id}.1" if domain == DOMAIN_OZW else str(node_id)
+
+    return {
+        "config_entries": [uuid.UUID(int=random_generator.getrandbits(128)).hex],
+        "connections": [],
+        "manufacturer": manufacturer,
+        "model": product,
+        "name": f"{manufacturer} {product}",
+        "sw_version": f"{random_generator.randint(1, 5)}.{random_generator.randint(0, 99)}",
+        "entry_type": None,
+        "id": uuid.UUID(int=random_generator.getrandbits(128)).hex,
+        "identifiers": [[domain, external_id]],
+        "via_device_id": None,
+        "area_id": None,
+        "name_by_user": None,
+        "disabled_by": None
+    }
+
+
+def get_entity(random_generator: random.Random, entity_id: str, device_id: str, platform: str) -> dict:
+    return {
+        "config_entry_id": None,
+        "device_id": device_id,
+        "area_id": None,
+        "disabled_by": None,
+        "entity_id": entity_id,
+        "name": None,
+        "icon": None,
+        "platform": platform,
+        "unique_id": uuid.UUID(int=random_generator.getrandbits(128)).hex
+    }
+
+
+def get_state(random_generator: random.Random, entity_id: str, state, attributes: dict) -> dict:
+    return {
+        "entity_id": entity_id,
+        "state": state,
+        "attributes": attributes,
+        "last_changed": "2020-11-12T00:00:00.000000+00:00",
+        "last_updated": "2020-11-12T00:00:00.000000+00:00",
+        "context": {
+            "id": uuid.UUID(int=random_generator.getrandbits(128)).hex,
+            "parent_id": None,
+            "user_id": None
+        }
+    }
+
+
+def get_zwave_status(device: dict,
+                     node_id: int,
+                     neighbors: Optional[List[int]],
+                     is_controller: bool,
+                     is_failed: bool = False) -> dict:
+    capabilities = ["primaryController", "staticUpdateController"] if is_controller else ["routing", "beaming"]
+
+    attributes = {
+        "node_id": node_id,
+        "neighbors": neighbors,
+        "capabilities": capabilities,
+        "is_awake": not is_failed,
+        "is_failed": is_failed,
+        "is_info_received": True,
+        "is_ready": True,
+        "is_zwave_plus": True,
+        "query_stage": "Complete",
+        "manufacturer_name": device.get("manufacturer"),
+        "product_name": device.get("model"),
+        "application_version": device.get("sw_version"),
+        "lastResponseRTT": 20,
+        "averageResponseRTT": 25,
+        "friendly_name": device.get("name")
+    }
+
+    return attributes
+
+
+def get_ozw_status(device: dict,
+                   node_id: int,
+                   neighbors: Optional[List[int]],
+                   is_controller: bool,
+                   is_failed: bool = False) -> dict:
+    return {
+        "node_query_stage": "Complete",
+        "node_id": node_id,
+        "is_zwave_plus": True,
+        "is_awake": not is_failed,
+        "is_failed": is_failed,
+        "node_baud_rate": 100000,
+        "is_beaming": True,
+        "is_flirs": False,
+        "is_routing": True,
+        "is_securityv1": False,
+        "node_basic_string": "Static Controller" if is_controller else "Routing Slave",
+        "node_generic_string": "Static Controller" if is_controller else "Binary Switch",
+        "node_specific_string": "Static PC Controller" if is_controller else "Binary Power Switch",
+        "node_manufacturer_name": device.get("manufacturer"),
+        "node_product_name": device.get("model"),
+        "neighbors": neighbors
+    }
+
+
+def generate_mesh(nodes: int = 50,
+                  neighbors: int = 4,
+                  domain: str = DOMAIN_ZWAVE,
+                  entities_per_node: int = 3,
+                  other_entities: int = 0,
+                  seed: int = 1,
+                  failed_ratio: float = 0,
+                  missing_neighbors_ratio: float = 0,
+                  controllers: int = 1) -> Dict[str, list]:
+    if controllers > 1 and domain != DOMAIN_OZW:
+        raise ValueError(f"Multiple controllers are supported only by {DOMAIN_OZW.upper()}")
+
+    random_generator = random.Random(seed)
+
+    devices = []
+    entities = []
+    states = []
+    ozw_statuses = []
+
+    for index in range(nodes * controllers):
+        controller_id = index // nodes + 1
+        node_id = index % nodes + 1
+        is_controller = node_id == 1
+
+        if is_controller:
+            positions = get_positions(random_generator, nodes)
+            node_neighbors = get_neighbors(positions, neighbors)
+
+        is_failed = not is_controller and failed_ratio > 0 and random_generator.random() < failed_ratio
+        neighbors_list = node_neighbors[node_id - 1]
+
+        if not is_controller and missing_neighbors_ratio > 0 and random_generator.random() < missing_neighbors_ratio:
+            neighbors_list = None
+
+        device = get_device(random_generator, domain, node_id, is_controller, controller_id)
+        device_id = device.get("id")
+        prefix = f"node_{node_id}" if controller_id == 1 else f"node_{controller_id}_{node_id}"
+
+        devices.append(device)
+
+        if domain == DOMAIN_OZW:
+            ozw_status = get_ozw_status(device, node_id, neighbors_list, is_controller, is_failed)
+            ozw_status["ozw_instance"] = controller_id
+
+            ozw_statuses.append(ozw_status)
+
+        else:
+            entity_id = f"{DOMAIN_ZWAVE}.{prefix}"
+            attributes = get_zwave_status(device, node_id, neighbors_list, is_controller, is_failed)
+
+            entities.append(get_entity(random_generator, entity_id, device_id, DOMAIN_ZWAVE))
+            states.append(get_state(random_generator, entity_id, "dead" if is_failed else "ready", attributes))
+
+        for entity_index in range(entities_per_node):
+            if entity_index == 0:
+                entity_id = f"sensor.{prefix}_battery_level"
+                state = str(random_generator.randint(5, 100))
+                attributes = {"unit_of_measurement": "%", "device_class": "battery"}
+
+            else:
+                entity_id = f"sensor.{prefix}_power_{entity_index}"
+                state = f"{random_generator.random() * 100:.1f}"
+                attributes = {"unit_of_measurement": "W", "device_class": "power"}
+
+            attributes["friendly_name"] = f"{device.get('name')} {entity_id}"
+
+            entities.append(get_entity(random_generator, entity_id, device_id, domain))
+            states.append(get_state(random_generator, entity_id, state, attributes))
+
+    for entity_index in range(other_entities):
+        entity_id = f"light.other_{entity_index}"
+        attributes = {"friendly_name": f"Other {entity_index}", "brightness": random_generator.randint(0, 255)}
+
+        entities.append(get_entity(random_generator, entity_id, None, "hue"))
+        states.append(get_state(random_generator, entity_id, "on", attributes))
+
+    return {
+        "Devices": devices,
+        "Entities": entities,
+        "States": states,
+        "OZWStatus": ozw_statuses
+    }
+
+
+def save_mesh(data: Dict[str, list], output_dir: str):
+    os.makedirs(output_dir, exist_ok=True)
+
+    for key in ["Devices", "Entities", "States"]:
+        with open(f"{output_dir}/{key.lower()}.json", "w") as f:
+            json.dump(data.get(key), f, indent=4)
+
+    for ozw_status in data.get("OZWStatus", []):
+        controller_id = ozw_status.get("ozw_instance", 1)
+        node_id = ozw_status.get("node_id")
+        name = f"ozwstatus_{node_id}" if controller_id == 1 else f"ozwstatus_{controller_id}_{node_id}"
+
+        with open(f"{output_dir}/{name}.json", "w") as f:
+            json.dump(ozw_status, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic Z-Wave mesh generator")
+    parser.add_argument("--nodes", type=int, default=50, help="Number of Z-Wave nodes, including the controller")
+    parser.add_argument("--neighbors", type=int, default=4, help="Nearest nodes linked to each node")
+    parser.add_argument("--domain", default=DOMAIN_ZWAVE, choices=[DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--entities-per-node", type=int, default=3, help="Sensor entities of each node")
+    parser.add_argument("--other-entities", type=int, default=0, help="Entities not linked to Z-Wave")
+    parser.add_argument("--failed-ratio", type=float, default=0, help="Part of nodes marked as failed")
+    parser.add_argument("--missing-neighbors-ratio", type=float, default=0, help="Part of nodes without neighbors list")
+    parser.add_argument("--controllers", type=int, default=1, help="OZW instances, each with its own mesh of --nodes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="debug", help="Directory to write debug JSON files (as /debug)")
+
+    args = parser.parse_args()
+
+    data = generate_mesh(args.nodes,
+                         args.neighbors,
+                         args.domain,
+                         args.entities_per_node,
+                         args.other_entities,
+                         args.seed,
+                         args.failed_ratio,
+                         args.missing_neighbors_ratio,
+                         args.controllers)
+
+    save_mesh(data, args.output)
+
+    print(f"{args.controllers} x {args.nodes} {args.domain.upper()} nodes, "
+          f"{len(data.get('States'))} states written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
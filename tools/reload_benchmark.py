@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from Managers.configuration_manager import ConfigurationManager
+from Managers.data_manager import HAZWaveManager
+from models.consts import WEB_SOCKET_STATUS_AUTHORIZED
+
+
+def wait_for_port(port: int, timeout: float):
+    started = time.monotonic()
+
+    while time.monotonic() - started < timeout:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+
+        except OSError:
+            time.sleep(0.1)
+
+    raise Exception(f"Replay server did not start on port {port}")
+
+
+def start_replay_server(args, nodes: int) -> subprocess.Popen:
+    command = [
+        sys.executable, f"{TOOLS_DIR}/replay_server.py",
+        "--port", str(args.port),
+        "--nodes", str(nodes),
+        "--neighbors", str(args.neighbors),
+        "--domain", args.domain,
+        "--entities-per-node", str(args.entities_per_node),
+        "--other-entities", str(args.other_entities),
+        "--latency", str(args.latency),
+        "--change-rate", str(args.change_rate)
+    ]
+
+    if args.debug_dir is not None:
+        command.extend(["--debug-dir", args.debug_dir])
+
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    wait_for_port(args.port, 60)
+
+    return process
+
+
+def get_percentile(durations, percentile: float) -> float:
+    durations = sorted(durations)
+    index = min(int(len(durations) * percentile / 100), len(durations) - 1)
+
+    return durations[index]
+
+
+async def measure(manager: HAZWaveManager, reloads: int) -> dict:
+    manager._reload_required = asyncio.Event()
+
+    await manager._connect()
+    await manager._login()
+
+    if manager._ws_status != WEB_SOCKET_STATUS_AUTHORIZED:
+        raise Exception("Failed to login to replay server")
+
+    started = time.perf_counter()
+    await manager._reload_data()
+    first_duration = time.perf_counter() - started
+
+    durations = []
+    cpu_durations = []
+
+    for _ in range(reloads):
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+
+        await manager._reload_data()
+
+        cpu_durations.append(time.process_time() - cpu_started)
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+
+    await manager._reload_data()
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    health = manager.get_health()
+
+    return {
+        "first": first_duration,
+        "p50": get_percentile(durations, 50),
+        "max": max(durations),
+        "cpu": sum(cpu_durations) / len(cpu_durations),
+        "peak": peak,
+        "failures": health.get("reload_failures"),
+        "nodes": len(manager.get_nodes())
+    }
+
+
+def run(args):
+    os.environ["HA_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ["HA_TOKEN"] = "benchmark"
+    os.environ["DEBUG_DUMP"] = "off"
+    os.environ["FETCH_STRATEGY"] = args.fetch_strategy
+
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"Domain: {args.domain}, fetch strategy: {args.fetch_strategy}, latency: {args.latency}s, "
+          f"change rate: {args.change_rate}/s, reloads: {args.reloads}")
+    print(f"{'Nodes':>6} {'Graph':>6} {'First':>9} {'p50':>9} {'Max':>9} {'CPU':>9} {'Peak':>10} {'RSS':>8} {'Fail':>5}")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.debug_dir is not None:
+        sizes = [0]
+
+    for nodes in sizes:
+        process = start_replay_server(args, nodes)
+
+        try:
+            manager = HAZWaveManager(ConfigurationManager())
+
+            result = asyncio.run(measure(manager, args.reloads))
+
+        finally:
+            process.terminate()
+            process.wait()
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        print(f"{nodes or '-':>6} "
+              f"{result.get('nodes'):>6} "
+              f"{result.get('first') * 1000:>7.1f}ms "
+              f"{result.get('p50') * 1000:>7.1f}ms "
+              f"{result.get('max') * 1000:>7.1f}ms "
+              f"{result.get('cpu') * 1000:>7.1f}ms "
+              f"{result.get('peak') / 1024:>7.0f}KiB "
+              f"{max_rss:>5.0f}MiB "
+              f"{result.get('failures'):>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end reload benchmark against the replay server")
+    parser.add_argument("--sizes", default="25,50,100,232", help="Comma separated node counts")
+    parser.add_argument("--reloads", type=int, default=10, help="Measured reloads per size")
+    parser.add_argument("--port", type=int, default=18123, help="Replay server port")
+    parser.add_argument("--neighbors", type=int, default=4)
+    parser.add_argument("--domain", default="zwave", choices=["zwave", "ozw"])
+    parser.add_argument("--entities-per-node", type=int, default=3)
+    parser.add_argument("--other-entities", type=int, default=1000, help="Entities not linked to Z-Wave")
+    parser.add_argument("--latency", type=float, default=0, help="Replay server response latency in seconds")
+    parser.add_argument("--change-rate", type=float, default=0, help="Replay server state changes per second")
+    parser.add_argument("--fetch-strategy", default="full", choices=["full", "zwave"])
+    parser.add_argument("--debug-dir", help="Replay recorded debug JSON files (as /debug) instead of synthetic meshes")
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
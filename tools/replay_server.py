@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import copy
+import gzip
+import json
+import logging
+import os
+import random
+import sys
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import asyncws
+
+from mesh_generator import DOMAIN_OZW, DOMAIN_ZWAVE, generate_mesh
+
+HA_VERSION = "replay"
+
+EVENT_STATE_CHANGED = "state_changed"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_debug_file(debug_dir: str, name: str):
+    file_path = f"{debug_dir}/{name}.json"
+
+    if os.path.exists(f"{file_path}.gz"):
+        with open(f"{file_path}.gz", "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    if not os.path.exists(file_path):
+        return None
+
+    with open(file_path, "rb") as f:
+        return json.loads(f.read())
+
+
+def load_debug_dir(debug_dir: str) -> Dict[str, list]:
+    data = {}
+
+    for key in ["Devices", "Entities", "States"]:
+        data[key] = load_debug_file(debug_dir, key.lower()) or []
+
+    data["OZWStatus"] = []
+
+    for file_name in sorted(os.listdir(debug_dir)):
+        if file_name.startswith("ozwstatus_"):
+            name = file_name.split(".")[0]
+            name_parts = name.split("_")
+            ozw_status = load_debug_file(debug_dir, name)
+
+            if ozw_status is not None:
+                ozw_status.setdefault("ozw_instance", int(name_parts[1]) if len(name_parts) > 2 else 1)
+
+                data["OZWStatus"].append(ozw_status)
+
+    return data
+
+
+class ReplayClient:
+    websocket: asyncws.Websocket
+    events: Dict[int, Optional[str]]
+    triggers: Dict[int, set]
+
+    def __init__(self, websocket: asyncws.Websocket):
+        self.websocket = websocket
+        self.events = {}
+        self.triggers = {}
+
+    def __repr__(self):
+        return f"{self.__dict__}"
+
+
+class ReplayServer:
+    def __init__(self,
+                 data: Dict[str, list],
+                 latency: float = 0,
+                 change_rate: float = 0,
+                 topology_change_ratio: float = 0.1,
+                 seed: int = 1):
+        self._devices = data.get("Devices", [])
+        self._entities = data.get("Entities", [])
+        self._states: Dict[str, dict] = {state.get("entity_id"): state for state in data.get("States", [])}
+        self._ozw_statuses: Dict[Tuple[int, int], dict] = {(item.get("ozw_instance", 1), item.get("node_id")): item
+                                                           for item in data.get("OZWStatus", [])}
+
+        self._latency = latency
+        self._change_rate = change_rate
+        self._topology_change_ratio = topology_change_ratio
+        self._random = random.Random(seed)
+
+        self._clients: List[ReplayClient] = []
+        self._server = None
+        self._changes_task: Optional[asyncio.Future] = None
+
+        self.changes = 0
+        self.messages = 0
+
+    async def start(self, host: str, port: int):
+        self._server = await asyncws.start_server(self._handle_client, host, port)
+
+        if self._change_rate > 0:
+            self._changes_task = asyncio.ensure_future(self._simulate_changes())
+
+        _LOGGER.info(f"Replaying {len(self._devices)} devices, {len(self._states)} states on {host}:{port}")
+
+    async def _handle_client(self, websocket: asyncws.Websocket):
+        client = ReplayClient(websocket)
+
+        self._clients.append(client)
+
+        try:
+            await websocket.send(json.dumps({"type": "auth_required", "ha_version": HA_VERSION}))
+
+            while True:
+                message = await websocket.recv()
+
+                if message is None:
+                    break
+
+                asyncio.ensure_future(self._handle_message(client, json.loads(message)))
+
+        except Exception as ex:
+            _LOGGER.warning(f"Client disconnected due to error: {ex}")
+
+        self._clients.remove(client)
+
+    async def _handle_message(self, client: ReplayClient, message: dict):
+        message_id = message.get("id")
+        message_type = message.get("type")
+
+        if self._latency > 0:
+            await asyncio.sleep(self._latency)
+
+        if message_type == "auth":
+            await self._send(client, {"type": "auth_ok", "ha_version": HA_VERSION})
+            return
+
+        if message_type == "ping":
+            await self._send(client, {"id": message_id, "type": "pong"})
+            return
+
+        result = None
+        error = None
+
+        if message_type == "config/device_registry/list":
+            result = self._devices
+
+        elif message_type == "config/entity_registry/list":
+            result = self._entities
+
+        elif message_type == "get_states":
+            result = list(self._states.values())
+
+        elif message_type == "ozw/node_status":
+            result = self._ozw_statuses.get((message.get("ozw_instance", 1), message.get("node_id")))
+
+            if result is None:
+                error = {"code": "not_found", "message": "OZW Node not found"}
+
+        elif message_type == "subscribe_events":
+            client.events[message_id] = message.get("event_type")
+
+        elif message_type == "subscribe_trigger":
+            entity_ids = message.get("trigger", {}).get("entity_id", [])
+
+            if isinstance(entity_ids, str):
+                entity_ids = [entity_ids]
+
+            client.triggers[message_id] = set(entity_ids)
+
+        elif message_type == "unsubscribe_events":
+            subscription = message.get("subscription")
+
+            client.events.pop(subscription, None)
+            client.triggers.pop(subscription, None)
+
+        else:
+            error = {"code": "unknown_command", "message": "Unknown command."}
+
+        response = {"id": message_id, "type": "result", "success": error is None}
+
+        if error is None:
+            response["result"] = result
+
+        else:
+            response["error"] = error
+
+        await self._send(client, response)
+
+    async def _send(self, client: ReplayClient, message: dict):
+        self.messages += 1
+
+        await client.websocket.send(json.dumps(message))
+
+    async def _simulate_changes(self):
+        interval = 1 / self._change_rate
+
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await self._change()
+
+            except Exception as ex:
+                _LOGGER.error(f"Failed to simulate change due to error: {ex}")
+
+    async def _change(self):
+        self.changes += 1
+
+        if self._random.random() < self._topology_change_ratio:
+            await self._change_topology()
+            return
+
+        entity_id = self._random.choice(list(self._states.keys()))
+        old_state = self._states.get(entity_id)
+
+        new_state = copy.deepcopy(old_state)
+        new_state["state"] = f"{self._random.random() * 100:.1f}"
+        new_state["last_changed"] = new_state["last_updated"] = datetime.now(timezone.utc).isoformat()
+
+        await self._set_state(entity_id, old_state, new_state)
+
+    async def _change_topology(self):
+        if len(self._ozw_statuses) > 0:
+            ozw_key = self._random.choice(list(self._ozw_statuses.keys()))
+            status = self._ozw_statuses[ozw_key]
+            nodes = len([key for key in self._ozw_statuses.keys() if key[0] == ozw_key[0]])
+
+            status["neighbors"] = self._get_changed_neighbors(status.get("neighbors"), nodes)
+            return
+
+        entity_ids = [entity_id for entity_id in self._states.keys() if entity_id.startswith(f"{DOMAIN_ZWAVE}.")]
+
+        if len(entity_ids) == 0:
+            return
+
+        entity_id = self._random.choice(entity_ids)
+        old_state = self._states.get(entity_id)
+
+        new_state = copy.deepcopy(old_state)
+        attributes = new_state.get("attributes", {})
+        attributes["neighbors"] = self._get_changed_neighbors(attributes.get("neighbors"), len(entity_ids))
+
+        await self._set_state(entity_id, old_state, new_state)
+
+    def _get_changed_neighbors(self, neighbors: Optional[List[int]], nodes: int) -> List[int]:
+        neighbors = list(neighbors or [])
+
+        if len(neighbors) > 1 and self._random.random() < 0.5:
+            neighbors.remove(self._random.choice(neighbors))
+
+        else:
+            neighbor = self._random.randint(1, nodes)
+
+            if neighbor not in neighbors:
+                neighbors.append(neighbor)
+
+        return sorted(neighbors)
+
+    async def _set_state(self, entity_id: str, old_state: dict, new_state: dict):
+        self._states[entity_id] = new_state
+
+        for client in list(self._clients):
+            for subscription, event_type in client.events.items():
+                if event_type is None or event_type == EVENT_STATE_CHANGED:
+                    event = {
+                        "event_type": EVENT_STATE_CHANGED,
+                        "data": {
+                            "entity_id": entity_id,
+                            "old_state": old_state,
+                            "new_state": new_state
+                        },
+                        "origin": "LOCAL",
+                        "time_fired": new_state.get("last_updated")
+                    }
+
+                    await self._send(client, {"id": subscription, "type": "event", "event": event})
+
+            for subscription, entity_ids in client.triggers.items():
+                if entity_id in entity_ids:
+                    trigger = {
+                        "platform": "state",
+                        "entity_id": entity_id,
+                        "from_state": old_state,
+                        "to_state": new_state,
+                        "for": None,
+                        "attribute": None,
+                        "description": f"state of {entity_id}"
+                    }
+
+                    event = {"variables": {"trigger": trigger}, "context": None}
+
+                    await self._send(client, {"id": subscription, "type": "event", "event": event})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Home Assistant WebSocket server replaying Z-Wave data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--debug-dir", help="Replay debug JSON files (as /debug) instead of a synthetic mesh")
+    parser.add_argument("--nodes", type=int, default=50, help="Number of synthetic Z-Wave nodes")
+    parser.add_argument("--neighbors", type=int, default=4, help="Nearest nodes linked to each synthetic node")
+    parser.add_argument("--domain", default=DOMAIN_ZWAVE, choices=[DOMAIN_ZWAVE, DOMAIN_OZW])
+    parser.add_argument("--entities-per-node", type=int, default=3, help="Sensor entities of each synthetic node")
+    parser.add_argument("--other-entities", type=int, default=0, help="Synthetic entities not linked to Z-Wave")
+    parser.add_argument("--failed-ratio", type=float, default=0, help="Part of synthetic nodes marked as failed")
+    parser.add_argument("--missing-neighbors-ratio", type=float, default=0, help="Part of synthetic nodes without neighbors")
+    parser.add_argument("--latency", type=float, default=0, help="Seconds to wait before each response")
+    parser.add_argument("--change-rate", type=float, default=0, help="State changes per second")
+    parser.add_argument("--topology-change-ratio", type=float, default=0.1, help="Part of changes updating neighbors")
+    parser.add_argument("--controllers", type=int, default=1, help="Synthetic OZW instances, each with --nodes nodes")
+    parser.add_argument("--seed", type=int, default=1)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)])
+
+    if args.debug_dir is not None:
+        data = load_debug_dir(args.debug_dir)
+
+    else:
+        data = generate_mesh(args.nodes,
+                             args.neighbors,
+                             args.domain,
+                             args.entities_per_node,
+                             args.other_entities,
+                             args.seed,
+                             args.failed_ratio,
+                             args.missing_neighbors_ratio,
+                             args.controllers)
+
+    server = ReplayServer(data, args.latency, args.change_rate, args.topology_change_ratio, args.seed)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start(args.host, args.port))
+
+    try:
+        loop.run_forever()
+
+    except KeyboardInterrupt:
+        _LOGGER.info(f"Stopped after {server.changes} changes, {server.messages} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from typing import Dict, List, Optional, Tuple
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(TOOLS_DIR))
+
+from werkzeug.serving import make_server
+
+from mesh_generator import DOMAIN_OZW, generate_mesh
+
+from Managers.configuration_manager import ConfigurationManager
+from Managers.data_manager import HAZWaveManager
+
+import webserver
+
+
+class Published:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.etags: Dict[int, str] = {}
+        self.controllers_content: Dict[int, Dict[str, str]] = {}
+
+    def add(self, manager: HAZWaveManager):
+        snapshot = manager.get_nodes_snapshot()
+
+        with self._lock:
+            self.etags[snapshot.generation] = snapshot.etag
+            self.controllers_content[snapshot.generation] = {
+                controller: hashlib.sha1(content).hexdigest()
+                for controller, content in snapshot.controllers_content.items()
+            }
+
+
+def get_variants(args) -> List[Dict[str, list]]:
+    variants = []
+
+    for index in range(args.variants):
+        variants.append(generate_mesh(args.nodes - index * 10,
+                                      args.neighbors,
+                                      DOMAIN_OZW,
+                                      2,
+                                      0,
+                                      args.seed + index,
+                                      0.05,
+                                      0.05,
+                                      args.controllers))
+
+    return variants
+
+
+def load(manager: HAZWaveManager, data: Dict[str, list]):
+    data = copy.deepcopy(data)
+    ozw_statuses = {(item.get("ozw_instance", 1), item.get("node_id")): item for item in data.get("OZWStatus", [])}
+
+    asyncio.run(manager.load_devices(data))
+
+    for device in manager._devices:
+        ozw_key = (device.get("ControllerID"), device.get("NodeID"))
+
+        if ozw_key in ozw_statuses:
+            device["OZWStatus"] = ozw_statuses.get(ozw_key)
+
+    manager._update_nodes()
+
+
+def reload_loop(manager: HAZWaveManager,
+                variants: List[Dict[str, list]],
+                published: Published,
+                stop: threading.Event,
+                counters: Dict[str, int]):
+    index = 0
+
+    while not stop.is_set():
+        load(manager, variants[index % len(variants)])
+        published.add(manager)
+
+        counters["reloads"] += 1
+        index += 1
+
+
+def read_loop(base_url: str, controllers: List[str], stop: threading.Event, results: List[tuple]):
+    index = 0
+    generation = None
+
+    while not stop.is_set():
+        controller = controllers[index % len(controllers)]
+        path = ["/data/nodes.json",
+                f"/data/nodes.json?controller={controller}",
+                f"/data/nodes.json?since={generation}&controller={controller}"][index % 3]
+
+        if generation is None and "since" in path:
+            path = "/data/nodes.json"
+
+        index += 1
+
+        try:
+            with urllib.request.urlopen(f"{base_url}{path}") as response:
+                content = response.read()
+                headers = response.headers
+
+                generation = int(headers.get("X-Graph-Generation"))
+
+                results.append((path, controller, generation, headers.get("ETag"), content))
+
+        except urllib.error.HTTPError as ex:
+            results.append((path, controller, None, None, f"HTTP {ex.code}".encode("utf-8")))
+
+        except Exception as ex:
+            results.append((path, controller, None, None, f"{type(ex).__name__}: {ex}".encode("utf-8")))
+
+
+def check(result: tuple, published: Published) -> Optional[str]:
+    path, controller, generation, etag, content = result
+
+    if generation is None:
+        return content.decode("utf-8")
+
+    if generation not in published.etags:
+        return f"generation {generation} was never published"
+
+    if "since" in path:
+        delta = json.loads(content)
+
+        if delta.get("generation") != generation:
+            return f"delta of generation {delta.get('generation')} served as {generation}"
+
+        nodes = delta.get("nodes", [])
+        items = nodes if delta.get("full") else nodes.get("added", []) + nodes.get("changed", [])
+
+        if any(item.get("controller") != controller for item in items):
+            return f"delta of {controller} contains nodes of other controllers"
+
+        return None
+
+    content_hash = hashlib.sha1(content).hexdigest()
+
+    if "controller" in path:
+        if published.controllers_content[generation].get(controller) != content_hash:
+            return f"content of {controller} does not match generation {generation}"
+
+        if etag != f'"{published.etags[generation]}.{controller}"':
+            return f"ETag {etag} of {controller} does not match generation {generation}"
+
+        return None
+
+    if etag != f'"{content_hash}"' or published.etags[generation] != content_hash:
+        return f"content does not match generation {generation}"
+
+    return None
+
+
+def run(args):
+    snapshot_dir = tempfile.mkdtemp()
+
+    os.environ.setdefault("HA_URL", "http://127.0.0.1:8123")
+    os.environ.setdefault("HA_TOKEN", "stress")
+    os.environ["DEBUG_DUMP"] = "off"
+    os.environ["SHARED_SNAPSHOT"] = "true" if args.shared else "false"
+    os.environ["SHARED_SNAPSHOT_PATH"] = f"{snapshot_dir}/ha-zwave-network.snapshot"
+
+    logging.basicConfig(level=logging.ERROR)
+
+    configuration = ConfigurationManager()
+
+    manager_initialize = HAZWaveManager.initialize
+    HAZWaveManager.initialize = lambda manager: None
+
+    try:
+        app = webserver.create_app(configuration)
+
+    finally:
+        HAZWaveManager.initialize = manager_initialize
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    manager = HAZWaveManager(configuration) if args.shared else app.extensions[webserver.EXTENSION_MANAGER]
+
+    variants = get_variants(args)
+    published = Published()
+
+    load(manager, variants[0])
+    published.add(manager)
+
+    controllers = [item.get("id") for item in manager.get_nodes_snapshot().controllers]
+
+    server = make_server("127.0.0.1", args.port, app, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    stop = threading.Event()
+    counters = {"reloads": 0}
+    results: List[Tuple] = []
+
+    threads = [threading.Thread(target=reload_loop, args=(manager, variants, published, stop, counters))]
+
+    for _ in range(args.readers):
+        threads.append(threading.Thread(target=read_loop,
+                                        args=(f"http://127.0.0.1:{args.port}", controllers, stop, results)))
+
+    for thread in threads:
+        thread.start()
+
+    time.sleep(args.duration)
+
+    stop.set()
+
+    for thread in threads:
+        thread.join()
+
+    server.shutdown()
+
+    errors = {}
+
+    for result in results:
+        error = check(result, published)
+
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+
+    generations = {result[2] for result in results if result[2] is not None}
+
+    print(f"Mode:        {'shared snapshot' if args.shared else 'single process'}, "
+          f"{args.controllers} x {args.nodes} nodes, {args.variants} variants")
+    print(f"Reloads:     {counters['reloads']} in {args.duration}s")
+    print(f"Requests:    {len(results)} by {args.readers} readers")
+    print(f"Generations: {len(generations)} seen by readers")
+    print(f"Errors:      {sum(errors.values())}")
+
+    for error, count in errors.items():
+        print(f"  {count} x {error}")
+
+    if len(errors) > 0:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test of concurrent reloads and readers over HTTP")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+    parser.add_argument("--readers", type=int, default=8, help="Parallel HTTP readers")
+    parser.add_argument("--nodes", type=int, default=100, help="Nodes of each OZW instance")
+    parser.add_argument("--neighbors", type=int, default=4)
+    parser.add_argument("--controllers", type=int, default=2, help="OZW instances")
+    parser.add_argument("--variants", type=int, default=3, help="Meshes the reload loop cycles through")
+    parser.add_argument("--port", type=int, default=16123)
+    parser.add_argument("--shared", action="store_true", help="Serve through the shared snapshot reader")
+    parser.add_argument("--seed", type=int, default=1)
+
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
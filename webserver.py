@@ -1,74 +1,465 @@
+import multiprocessing
+import os
+import signal
 import sys
 import threading
+import time
 
-from typing import List
-
-from flask import Flask, render_template, jsonify
+from flask import Blueprint, Flask, Response, current_app, render_template, request, jsonify, abort, \
+    stream_with_context, g
 
 import logging
 
+from datetime import datetime
+from typing import Optional
+
 from Managers.data_manager import HAZWaveManager
+from Managers.mesh_analytics import MeshAnalytics
 from Managers.configuration_manager import ConfigurationManager
+from Managers.metrics_manager import MetricsManager
+from Managers.profiling_manager import ProfilingManager
+from Managers.shared_snapshot_manager import SharedSnapshotReader
+from Managers.topology_history import TopologyHistory
 from models.consts import *
-from models.node_relation import NodeRelation
+from models.nodes_snapshot import NodesSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
-app = Flask(__name__)
-configuration = ConfigurationManager()
-configuration.initialize()
+views = Blueprint("views", __name__)
+admin = Blueprint("admin", __name__)
+history = Blueprint("history", __name__)
+
+
+def create_app(configuration: Optional[ConfigurationManager] = None) -> Flask:
+    if configuration is None:
+        configuration = ConfigurationManager()
+        configuration.initialize(clear_debug_dir=not configuration.is_shared_snapshot)
+
+    if configuration.is_shared_snapshot:
+        manager = SharedSnapshotReader(configuration.shared_snapshot_path)
+        profiler = ProfilingManager(configuration.profiling_top, [PROFILE_TARGET_NODES])
+        topology_history = TopologyHistory(configuration.topology_history_path,
+                                           configuration.topology_history_retention)
+
+    else:
+        manager = HAZWaveManager(configuration)
+        profiler = manager.get_profiler()
+        topology_history = manager.get_topology_history()
+
+        if configuration.server_mode == SERVER_MODE_PRODUCTION:
+            if configuration.is_profiling:
+                _LOGGER.info("SIGUSR2 is reserved by gunicorn, use POST /admin/profile?target=reload to profile reloads")
+
+        else:
+            register_profiling_signal(configuration, profiler)
+
+        initialize_thread = threading.Thread(target=manager.initialize, daemon=True)
+        initialize_thread.start()
+
+    app = Flask(__name__)
+    app.extensions[EXTENSION_MANAGER] = manager
+    app.extensions[EXTENSION_METRICS] = MetricsManager()
+    app.extensions[EXTENSION_PROFILER] = profiler
+    app.extensions[EXTENSION_TOPOLOGY_HISTORY] = topology_history
+    app.extensions[EXTENSION_ANALYTICS] = MeshAnalytics()
+    app.extensions[EXTENSION_STREAMS] = threading.BoundedSemaphore(configuration.stream_max_clients)
+
+    app.register_blueprint(views)
+
+    if configuration.is_profiling:
+        app.register_blueprint(admin)
+
+    if configuration.is_topology_history:
+        app.register_blueprint(history)
+
+    return app
+
+
+def run_sync_process():
+    configuration = ConfigurationManager()
+    configuration.initialize(clear_debug_dir=False)
+
+    manager = HAZWaveManager(configuration)
+
+    register_profiling_signal(configuration, manager.get_profiler())
+
+    manager.initialize()
+
+
+def start_sync_process() -> multiprocessing.Process:
+    sync_process = multiprocessing.Process(target=run_sync_process, name="ha-zwave-network-sync", daemon=True)
+    sync_process.start()
+
+    _LOGGER.info(f"Sync process started, PID: {sync_process.pid}")
+
+    return sync_process
+
+
+def register_profiling_signal(configuration: ConfigurationManager, profiler: ProfilingManager):
+    if not configuration.is_profiling or threading.current_thread() is not threading.main_thread():
+        return
+
+    def handle_signal(signal_number, frame):
+        profiler.start(PROFILE_TARGET_RELOAD, configuration.profiling_count)
+
+    signal.signal(signal.SIGUSR2, handle_signal)
+
+    _LOGGER.info(f"Send SIGUSR2 to process {os.getpid()} to profile the next {configuration.profiling_count} reloads")
+
+
+def get_manager() -> HAZWaveManager:
+    return current_app.extensions[EXTENSION_MANAGER]
+
+
+def get_metrics() -> MetricsManager:
+    return current_app.extensions[EXTENSION_METRICS]
+
+
+def get_profiler() -> ProfilingManager:
+    return current_app.extensions[EXTENSION_PROFILER]
+
+
+def get_topology_history() -> TopologyHistory:
+    return current_app.extensions[EXTENSION_TOPOLOGY_HISTORY]
+
+
+def get_analytics() -> MeshAnalytics:
+    return current_app.extensions[EXTENSION_ANALYTICS]
+
+
+def get_streams() -> threading.BoundedSemaphore:
+    return current_app.extensions[EXTENSION_STREAMS]
+
+
+def get_default_controller(snapshot: NodesSnapshot) -> Optional[str]:
+    return snapshot.controllers[0].get("id") if len(snapshot.controllers) > 0 else None
+
+
+def get_request_controller(snapshot: NodesSnapshot, default: Optional[str] = None) -> Optional[str]:
+    controller = request.args.get("controller", default)
+
+    if controller is not None and controller not in snapshot.controllers_content:
+        abort(404, description=f"Controller {controller} not found")
 
-manager = HAZWaveManager(configuration)
-initialize_thread = threading.Thread(target=manager.initialize)
-initialize_thread.start()
+    return controller
 
 
-@app.route("/")
+def get_request_time(name: str, default: float) -> float:
+    value = request.args.get(name)
+
+    if value is None:
+        return default
+
+    try:
+        return float(value)
+
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+@views.before_request
+def start_request():
+    g.request_started = time.perf_counter()
+
+
+@views.after_request
+def end_request(response: Response):
+    request_started = g.get("request_started")
+
+    if request_started is not None:
+        endpoint = "unknown" if request.url_rule is None else request.url_rule.rule
+
+        get_metrics().observe(METRIC_HTTP_REQUEST_DURATION,
+                              time.perf_counter() - request_started,
+                              endpoint=endpoint,
+                              status=str(response.status_code))
+
+    return response
+
+
+@views.route("/")
 def home():
     return home_index()
 
 
-@app.route(f"/{WEBSITE_INDEX}")
+@views.route(f"/{WEBSITE_INDEX}")
 def home_index():
     return render_template(WEBSITE_INDEX)
 
 
-@app.route("/data/nodes.json")
+@views.route("/data/nodes.json")
 def nodes_data():
     content = None
+    controller = get_request_controller(get_manager().get_nodes_snapshot())
+
+    with get_profiler().capture(PROFILE_TARGET_NODES):
+        try:
+            snapshot = get_manager().get_nodes_snapshot()
+            since = request.args.get("since", type=int)
+
+            if since is None and controller is not None:
+                content = Response(bytes(snapshot.controllers_content.get(controller, b"[]")),
+                                   mimetype="application/json")
+                content.set_etag(f"{snapshot.etag}.{controller}")
+                content.last_modified = snapshot.last_modified
+
+                content = content.make_conditional(request)
+
+            elif since is None:
+                content = Response(bytes(snapshot.content), mimetype="application/json")
+                content.set_etag(snapshot.etag)
+                content.last_modified = snapshot.last_modified
+
+                content = content.make_conditional(request)
+
+            else:
+                content = Response(get_manager().get_nodes_delta(snapshot, since, controller),
+                                   mimetype="application/json")
+
+            content.headers["X-Graph-Generation"] = str(snapshot.generation)
+
+            if snapshot.is_stale:
+                content.headers["X-Graph-Stale"] = "true"
+
+        except Exception as ex:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+
+            _LOGGER.error(f"Failed to get nodes due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    return content
+
+
+@views.route("/data/nodes/stream")
+def nodes_stream():
+    manager = get_manager()
+    streams = get_streams()
+    controller = get_request_controller(manager.get_nodes_snapshot())
+
+    if not streams.acquire(blocking=False):
+        content = Response("Too many streams", status=503, mimetype="text/plain")
+        content.headers["Retry-After"] = str(STREAM_MAX_DURATION)
+
+        return content
+
+    def generate():
+        generation = -1
+        last_content = None
+        closing_time = time.monotonic() + STREAM_MAX_DURATION
+
+        yield f"retry: {STREAM_RETRY_DELAY}\n\n"
+
+        while time.monotonic() < closing_time:
+            timeout = min(STREAM_KEEP_ALIVE_INTERVAL, closing_time - time.monotonic())
+            snapshot = manager.wait_for_nodes_snapshot(generation, max(timeout, 0))
+
+            if controller is None:
+                content = snapshot.content
+
+            else:
+                content = snapshot.controllers_content.get(controller, b"[]")
+
+            if snapshot.generation == generation or content == last_content:
+                yield ": keep-alive\n\n"
+
+            else:
+                yield f"id: {snapshot.generation}\nevent: nodes\ndata: {str(content, 'utf-8')}\n\n"
+
+            generation = snapshot.generation
+            last_content = content
+
+    content = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    content.call_on_close(streams.release)
+    content.headers["Cache-Control"] = "no-cache"
+    content.headers["X-Accel-Buffering"] = "no"
+
+    return content
+
+
+@views.route("/data/nodes/<int:node_id>.json")
+def node_data(node_id: int):
+    content = None
+
+    try:
+        instance_id = request.args.get("instance", 1, type=int)
+        controller = request.args.get("controller")
+
+        node_details = get_manager().get_node_details(node_id, instance_id, controller)
+
+        if node_details is not None:
+            content = jsonify(node_details)
+
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+
+        _LOGGER.error(f"Failed to get node {node_id} due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    if content is None:
+        abort(404)
+
+    return content
+
+
+@views.route("/data/health.json")
+def health_data():
+    content = None
 
     try:
-        nodes = manager.get_nodes()
+        content = jsonify(get_manager().get_health())
 
-        items = []
-        for node in nodes:
-            item = node.__dict__
-            edges: List[NodeRelation] = item.get("edges", [])
-            relations = []
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
 
-            for edge in edges:
-                if isinstance(edge, dict):
-                    relation = edge
-                else:
-                    relation = edge.__dict__
+        _LOGGER.error(f"Failed to get health due to error: {ex} [Line:{exc_tb.tb_lineno}]")
 
-                relations.append(relation)
+    return content
 
-            item["edges"] = relations
-            items.append(item)
 
-        content = jsonify(items)
+@views.route("/data/controllers.json")
+def controllers_data():
+    content = None
+
+    try:
+        content = jsonify(get_manager().get_nodes_snapshot().controllers)
 
     except Exception as ex:
         exc_type, exc_obj, exc_tb = sys.exc_info()
 
-        _LOGGER.error(f"Failed to get nodes due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+        _LOGGER.error(f"Failed to get controllers due to error: {ex} [Line:{exc_tb.tb_lineno}]")
 
     return content
 
 
-app.run(host=SERVER_BIND,
-        port=configuration.server_port,
-        debug=configuration.is_debug,
-        ssl_context=configuration.ssl_context)
+@views.route("/data/analytics.json")
+def analytics_data():
+    content = None
+    snapshot = get_manager().get_nodes_snapshot()
+    controller = get_request_controller(snapshot, get_default_controller(snapshot))
+
+    try:
+        content = Response(get_analytics().get_analytics(snapshot, controller), mimetype="application/json")
+        content.headers["X-Graph-Generation"] = str(snapshot.generation)
+
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+
+        _LOGGER.error(f"Failed to get analytics due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    return content
+
+
+@views.route("/metrics")
+def metrics_data():
+    content = None
+
+    try:
+        metrics = f"{get_metrics().render()}{get_manager().get_metrics()}"
+
+        content = Response(metrics, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+
+        _LOGGER.error(f"Failed to get metrics due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    return content
+
+
+@history.route("/data/history/graph.json")
+def history_graph_data():
+    content = None
+    snapshot = get_manager().get_nodes_snapshot()
+    controller = request.args.get("controller", get_default_controller(snapshot))
+
+    try:
+        timestamp = get_request_time("time", time.time())
+
+    except ValueError as ex:
+        abort(400, description=str(ex))
+
+    try:
+        content = jsonify(get_topology_history().get_graph(timestamp, controller))
+
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+
+        _LOGGER.error(f"Failed to get graph history due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    return content
+
+
+@history.route("/data/history/nodes/<int:node_id>.json")
+def history_node_data(node_id: int):
+    content = None
+    snapshot = get_manager().get_nodes_snapshot()
+    controller = request.args.get("controller", get_default_controller(snapshot))
+
+    try:
+        instance_id = request.args.get("instance", 1, type=int)
+        end = get_request_time("to", time.time())
+        start = get_request_time("from", end - TOPOLOGY_HISTORY_NODE_CHANGES_RANGE)
+
+    except ValueError as ex:
+        abort(400, description=str(ex))
+
+    try:
+        content = jsonify(get_topology_history().get_node_changes(node_id, instance_id, controller, start, end))
+
+    except Exception as ex:
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+
+        _LOGGER.error(f"Failed to get history of node {node_id} due to error: {ex} [Line:{exc_tb.tb_lineno}]")
+
+    return content
+
+
+@admin.route("/admin/profile", methods=["GET", "POST", "DELETE"])
+def profile_data():
+    profiler = get_profiler()
+
+    target = request.args.get("target", PROFILE_TARGET_RELOAD)
+
+    try:
+        if request.method == "POST":
+            profiler.start(target, request.args.get("count", PROFILING_COUNT, type=int))
+
+        elif request.method == "DELETE":
+            profiler.stop(target)
+
+    except Exception as ex:
+        _LOGGER.warning(f"Failed to change profiling of {target} due to error: {ex}")
+
+        abort(400, description=str(ex))
+
+    return jsonify(profiler.get_status())
+
+
+def run_production_server():
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    arguments = ["gunicorn", "--chdir", app_dir, "--config", f"{app_dir}/gunicorn.conf.py", "wsgi:app"]
+
+    _LOGGER.info(f"Starting production server: {' '.join(arguments)}")
+
+    os.execvp(arguments[0], arguments)
+
+
+def main():
+    configuration = ConfigurationManager()
+    configuration.initialize()
+
+    if configuration.server_mode == SERVER_MODE_PRODUCTION:
+        run_production_server()
+
+    if configuration.is_shared_snapshot:
+        start_sync_process()
+
+    app = create_app(configuration)
+
+    app.run(host=SERVER_BIND,
+            port=configuration.server_port,
+            debug=configuration.is_debug,
+            use_reloader=False,
+            ssl_context=configuration.ssl_context)
+
 
+if __name__ == "__main__":
+    main()
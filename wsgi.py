@@ -0,0 +1,3 @@
+from webserver import create_app
+
+app = create_app()